@@ -7,8 +7,51 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.config.dependencies import (
+    get_document_loader_service,
     get_ingest_use_case
 )
+from src.infrastructure.openai_client import close_openai_clients
+
+# Maximum number of files ingested at the same time
+MAX_CONCURRENT_FILES = 8
+
+
+async def process_one(use_case, path: Path) -> dict:
+    """Ingest a single file"""
+    print(f"Processing: {path}")
+    return await use_case.execute(str(path))
+
+
+def report(path: Path, task: asyncio.Task) -> None:
+    """Print the outcome of a finished ingestion task"""
+    error = task.exception()
+    if error is not None:
+        print(f"✗ Error processing {path}: {str(error)}")
+    else:
+        result = task.result()
+        print(f"✓ Successfully ingested {result['stories_ingested']} stories from {result['title']}")
+
+
+async def pipeline(use_case, paths: list) -> None:
+    """
+    Ingest files through a sliding window of in-flight tasks
+    
+    The next file starts loading as soon as a slot frees up, so PDF parsing
+    of one file overlaps the embedding requests of the others.
+    """
+    pending = {}
+    for path in paths:
+        task = asyncio.create_task(process_one(use_case, path))
+        pending[task] = path
+        if len(pending) >= MAX_CONCURRENT_FILES:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                report(pending.pop(task), task)
+    
+    if pending:
+        done, _ = await asyncio.wait(pending)
+        for task in done:
+            report(pending.pop(task), task)
 
 
 async def main():
@@ -18,8 +61,7 @@ async def main():
         print("Supported formats: .pdf, .txt (stories separated by empty lines)")
         sys.exit(1)
     
-    use_case = get_ingest_use_case()
-    
+    valid_paths = []
     for file_path in sys.argv[1:]:
         path = Path(file_path)
         if not path.exists():
@@ -32,14 +74,17 @@ async def main():
             print("Supported formats: .pdf, .txt")
             continue
         
-        try:
-            print(f"Processing: {file_path}")
-            result = await use_case.execute(str(path))
-            print(f"✓ Successfully ingested {result['stories_ingested']} stories from {result['title']}")
-        except Exception as e:
-            print(f"✗ Error processing {file_path}: {str(e)}")
+        valid_paths.append(path)
+    
+    use_case = get_ingest_use_case()
+    
+    try:
+        # Files are independent, so ingest them concurrently
+        await pipeline(use_case, valid_paths)
+    finally:
+        await close_openai_clients()
+        get_document_loader_service().close()
 
 
 if __name__ == "__main__":
     asyncio.run(main())
-
@@ -1,8 +1,11 @@
 """Application use cases"""
+import asyncio
+import os
 import uuid
-from typing import List
+from typing import AsyncIterator, List, Optional
 from pathlib import Path
-from src.domain.models import StoryDocument, StoryChunk, SearchResult, GeneratedResponse
+import numpy as np
+from src.domain.models import StoryChunk, SearchResult, GeneratedResponse
 from src.domain.repositories import (
     VectorStoreRepository,
     EmbeddingRepository,
@@ -19,7 +22,9 @@ class IngestStoriesUseCase:
         document_loader: DocumentLoaderService,
         text_chunker: TextChunkingService,
         embedding_service: EmbeddingRepository,
-        vector_store: VectorStoreRepository
+        vector_store: VectorStoreRepository,
+        batch_size: int = 256,
+        queue_size: int = 4
     ):
         """
         Initialize the ingest use case
@@ -29,63 +34,167 @@ class IngestStoriesUseCase:
             text_chunker: Service for chunking text
             embedding_service: Service for generating embeddings
             vector_store: Repository for storing chunks
+            batch_size: Number of chunks embedded and stored at a time
+            queue_size: Number of batches buffered between pipeline stages
         """
         self.document_loader = document_loader
         self.text_chunker = text_chunker
         self.embedding_service = embedding_service
         self.vector_store = vector_store
+        self.batch_size = batch_size
+        self.queue_size = queue_size
     
-    async def execute(self, file_path: str) -> dict:
+    def _build_chunks(
+        self,
+        text_chunks: List[str],
+        embeddings: List[np.ndarray],
+        base_metadata: dict,
+        first_index: int
+    ) -> List[StoryChunk]:
+        """
+        Create StoryChunk objects for an embedded batch
+        
+        Args:
+            text_chunks: Chunk texts
+            embeddings: Embedding of each chunk
+            base_metadata: Metadata shared by every chunk of the document
+            first_index: Document-wide index of the first chunk in the batch
+            
+        Returns:
+            List of StoryChunk objects
+        """
+        # Draw all chunk IDs from one random buffer
+        count = len(text_chunks)
+        raw_ids = os.urandom(16 * count)
+        chunk_ids = [
+            str(uuid.UUID(bytes=raw_ids[i * 16:(i + 1) * 16], version=4))
+            for i in range(count)
+        ]
+        return [
+            StoryChunk(
+                id=chunk_ids[i],
+                content=chunk_text,
+                metadata={**base_metadata, 'chunk_index': first_index + i},
+                embedding=embedding
+            )
+            for i, (chunk_text, embedding) in enumerate(zip(text_chunks, embeddings))
+        ]
+    
+    async def execute(
+        self,
+        file_path: str,
+        content: Optional[bytes] = None,
+        replace: bool = False
+    ) -> dict:
         """
         Execute the story ingestion process
         
+        Runs as a three-stage pipeline connected by bounded queues: reading
+        and chunking, embedding, and storing. Each stage works on batches of
+        batch_size chunks, so the stages overlap and memory use does not grow
+        with the file size.
+        
+        Ingestion is all or nothing: if any stage fails, the chunks already
+        added to the vector store are deleted again.
+        
         Args:
-            file_path: Path to the PDF file to ingest
+            file_path: Path to the PDF or TXT file to ingest
+            content: The file's bytes, if already in memory; file_path is
+                then only recorded as the chunks' source
+            replace: Delete the chunks previously ingested from file_path
+                first, so a changed file doesn't leave stale copies behind
             
         Returns:
             Dictionary with ingestion results
         """
-        # Load document
-        document = await self.document_loader.load_pdf(file_path)
+        title = Path(file_path).stem
+        base_metadata = {
+            'source': file_path,
+            'title': title,
+            'author': None
+        }
         
-        if not document.content:
-            raise ValueError(f"No content extracted from {file_path}")
+        text_queue = asyncio.Queue(maxsize=self.queue_size)
+        embed_queue = asyncio.Queue(maxsize=self.queue_size)
+        has_content = False
+        stored_ids = []
         
-        # Chunk text by story
-        text_chunks = self.text_chunker.chunk_text(document.content)
+        async def read():
+            """Stream the document's text, noting whether it has any"""
+            nonlocal has_content
+            if content is None:
+                texts = self.document_loader.stream_text(file_path)
+            else:
+                texts = self.document_loader.stream_text(file_path, content)
+            
+            async for text in texts:
+                if text and text.strip():
+                    has_content = True
+                yield text
         
-        if not text_chunks:
-            raise ValueError(f"No stories found in {file_path}")
+        async def produce():
+            """Read and chunk the document into batches"""
+            pending = []
+            next_index = 0
+            
+            # Chunk text by story
+            async for chunk in self.text_chunker.chunk_stream(read()):
+                pending.append(chunk)
+                if len(pending) == self.batch_size:
+                    await text_queue.put((next_index, pending))
+                    next_index += len(pending)
+                    pending = []
+            
+            if pending:
+                await text_queue.put((next_index, pending))
+            await text_queue.put(None)
         
-        # Generate embeddings for all chunks
-        embeddings = await self.embedding_service.generate_embeddings_batch(text_chunks)
+        async def embed():
+            """Generate embeddings for each batch"""
+            while (item := await text_queue.get()) is not None:
+                first_index, batch = item
+                embeddings = await self.embedding_service.generate_embeddings_batch(batch)
+                await embed_queue.put((first_index, batch, embeddings))
+            await embed_queue.put(None)
         
-        # Create StoryChunk objects
-        story_chunks = []
-        for i, (chunk_text, embedding) in enumerate(zip(text_chunks, embeddings)):
-            chunk_id = str(uuid.uuid4())
-            chunk = StoryChunk(
-                id=chunk_id,
-                content=chunk_text,
-                metadata={
-                    'source': document.source,
-                    'title': document.title or Path(file_path).stem,
-                    'author': document.author,
-                    'chunk_index': i,
-                    'total_chunks': len(text_chunks)
-                },
-                embedding=embedding
-            )
-            story_chunks.append(chunk)
+        async def store():
+            """Add each embedded batch to the vector store"""
+            while (item := await embed_queue.get()) is not None:
+                first_index, batch, embeddings = item
+                chunks = self._build_chunks(batch, embeddings, base_metadata, first_index)
+                # Noted before adding, since a failed add may have stored some
+                stored_ids.extend(chunk.id for chunk in chunks)
+                await self.vector_store.add_chunks(chunks)
+        
+        tasks = [asyncio.create_task(stage()) for stage in (produce, embed, store)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # A failed stage would leave the others blocked on their queues
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if stored_ids:
+                await self.vector_store.delete_chunks(stored_ids)
+            raise
         
-        # Store in vector database
-        await self.vector_store.add_chunks(story_chunks)
+        total_chunks = len(stored_ids)
+        
+        if not has_content:
+            raise ValueError(f"No content extracted from {file_path}")
+        
+        if not total_chunks:
+            raise ValueError(f"No stories found in {file_path}")
+        
+        if replace:
+            # Only once the new chunks are in, so a failed ingest keeps the old ones
+            await self.vector_store.delete_by_source(file_path, keep_ids=stored_ids)
         
         return {
             'file_path': file_path,
-            'title': document.title,
-            'stories_ingested': len(story_chunks),
-            'chunks_created': len(story_chunks)
+            'title': title,
+            'stories_ingested': total_chunks,
+            'chunks_created': total_chunks
         }
 
 
@@ -187,4 +296,34 @@ class GenerateResponseUseCase:
             citations=context_chunks,
             query=query
         )
-
+    
+    async def execute_stream(
+        self,
+        query: str,
+        top_k: int = 3
+    ) -> AsyncIterator[str]:
+        """
+        Execute the response generation process, streaming the answer
+        
+        Args:
+            query: User's query
+            top_k: Number of relevant chunks to retrieve
+            
+        Yields:
+            Pieces of the generated response
+        """
+        # Search for relevant chunks
+        search_results = await self.search_use_case.execute(query, top_k=top_k)
+        
+        if not search_results:
+            yield "I couldn't find any relevant stories to answer your query."
+            return
+        
+        # Extract chunks from search results
+        context_chunks = [result.chunk for result in search_results]
+        
+        async for piece in self.llm_service.generate_response_stream(
+            query=query,
+            context_chunks=context_chunks
+        ):
+            yield piece
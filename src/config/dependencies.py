@@ -1,6 +1,12 @@
 """Dependency injection container"""
 from functools import lru_cache
+from typing import Optional
 from src.config.settings import Settings, settings
+from src.application.use_cases import (
+    IngestStoriesUseCase,
+    SearchStoriesUseCase,
+    GenerateResponseUseCase
+)
 from src.domain.repositories import (
     VectorStoreRepository,
     EmbeddingRepository,
@@ -11,10 +17,18 @@ from src.domain.services import (
     TextChunkingService
 )
 from src.infrastructure.vector_store import ChromaDBVectorStore
-from src.infrastructure.embeddings import OpenAIEmbeddingService
-from src.infrastructure.llm import OpenAILLMService
+from src.infrastructure.embeddings import (
+    OpenAIEmbeddingService,
+    CachedEmbeddingService,
+    MicroBatchingEmbeddingService,
+    QueryEmbeddingLRU
+)
+from src.infrastructure.onnx_embeddings import ONNXEmbeddingService
+from src.infrastructure.llm import OpenAILLMService, CachedLLMService
 from src.infrastructure.document_loader import PDFDocumentLoader
 from src.infrastructure.chunking import LangChainTextChunker
+from src.infrastructure.semantic_cache import SemanticCache
+from src.infrastructure.rate_limiter import RateLimiter
 
 
 @lru_cache()
@@ -23,40 +37,126 @@ def get_settings() -> Settings:
     return settings
 
 
+@lru_cache()
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Get the OpenAI rate limiter shared by all services (singleton)"""
+    config = get_settings()
+    if config.openai_requests_per_minute <= 0:
+        return None
+    return RateLimiter(
+        requests_per_minute=config.openai_requests_per_minute,
+        tokens_per_minute=config.openai_tokens_per_minute,
+        max_retries=config.openai_max_retries
+    )
+
+
+@lru_cache()
 def get_vector_store_repository() -> VectorStoreRepository:
-    """Get vector store repository instance"""
+    """Get vector store repository instance (singleton)"""
     config = get_settings()
+    query_cache = None
+    if config.search_cache_ttl_seconds > 0:
+        query_cache = SemanticCache(
+            ttl_seconds=config.search_cache_ttl_seconds,
+            max_entries=config.search_cache_max_entries
+        )
     return ChromaDBVectorStore(
         db_path=config.chroma_db_path,
-        collection_name=config.collection_name
+        collection_name=config.collection_name,
+        search_ef=config.hnsw_search_ef,
+        query_cache=query_cache
     )
 
 
+@lru_cache()
 def get_embedding_repository() -> EmbeddingRepository:
-    """Get embedding repository instance"""
+    """Get embedding repository instance (singleton)"""
     config = get_settings()
-    return OpenAIEmbeddingService(
-        api_key=config.openai_api_key,
-        model_name=config.embedding_model
-    )
+    if config.embedding_backend == "onnx":
+        embedding_service = ONNXEmbeddingService(
+            model_path=config.onnx_model_path,
+            tokenizer_path=config.onnx_tokenizer_path,
+            pooling=config.onnx_pooling,
+            batch_size=config.onnx_batch_size,
+            num_sessions=config.onnx_num_sessions,
+            model_id=config.onnx_model_id
+        )
+    else:
+        embedding_service = OpenAIEmbeddingService(
+            api_key=config.openai_api_key,
+            model_name=config.embedding_model,
+            rate_limiter=get_rate_limiter()
+        )
+    if config.embedding_cache_enabled:
+        embedding_service = CachedEmbeddingService(
+            embedding_service=embedding_service,
+            db_path=config.embedding_cache_path,
+            model_name=embedding_service.model_name,
+            semantic_threshold=(
+                config.semantic_cache_threshold if config.semantic_cache_enabled else None
+            ),
+            storage_dtype=config.embedding_dtype
+        )
+    if config.embedding_micro_batch_wait_ms > 0:
+        embedding_service = MicroBatchingEmbeddingService(
+            embedding_service=embedding_service,
+            max_batch_size=config.embedding_micro_batch_size,
+            max_wait_ms=config.embedding_micro_batch_wait_ms
+        )
+    if config.query_embedding_cache_size > 0:
+        embedding_service = QueryEmbeddingLRU(
+            embedding_service=embedding_service,
+            max_entries=config.query_embedding_cache_size
+        )
+    return embedding_service
 
 
+@lru_cache()
 def get_llm_repository() -> LLMRepository:
-    """Get LLM repository instance"""
+    """Get LLM repository instance (singleton)"""
     config = get_settings()
-    return OpenAILLMService(
+    llm_service = OpenAILLMService(
         api_key=config.openai_api_key,
+        model_name=config.openai_model,
+        rate_limiter=get_rate_limiter()
+    )
+    if not config.response_cache_enabled:
+        return llm_service
+    return CachedLLMService(
+        llm_service=llm_service,
+        embedding_service=get_embedding_repository(),
+        cache=SemanticCache(
+            threshold=config.response_cache_threshold,
+            ttl_seconds=config.response_cache_ttl_seconds,
+            max_entries=config.response_cache_max_entries
+        ),
         model_name=config.openai_model
     )
 
 
+@lru_cache()
+def get_search_response_cache() -> Optional[SemanticCache]:
+    """Get the cache of complete search responses (singleton)"""
+    config = get_settings()
+    if not config.search_response_cache_enabled:
+        return None
+    return SemanticCache(
+        threshold=config.search_response_cache_threshold,
+        ttl_seconds=config.response_cache_ttl_seconds,
+        max_entries=config.search_response_cache_max_entries
+    )
+
+
+@lru_cache()
 def get_document_loader_service() -> DocumentLoaderService:
-    """Get document loader service instance"""
-    return PDFDocumentLoader()
+    """Get document loader service instance (singleton)"""
+    config = get_settings()
+    return PDFDocumentLoader(pdf_backend=config.pdf_backend)
 
 
+@lru_cache()
 def get_text_chunking_service() -> TextChunkingService:
-    """Get text chunking service instance"""
+    """Get text chunking service instance (singleton)"""
     config = get_settings()
     return LangChainTextChunker(
         chunk_size=config.chunk_size,
@@ -66,3 +166,32 @@ def get_text_chunking_service() -> TextChunkingService:
         overlap_words=config.overlap_words
     )
 
+
+# Dependency injection for use cases
+@lru_cache()
+def get_ingest_use_case() -> IngestStoriesUseCase:
+    """Get ingest use case with dependencies (singleton)"""
+    return IngestStoriesUseCase(
+        document_loader=get_document_loader_service(),
+        text_chunker=get_text_chunking_service(),
+        embedding_service=get_embedding_repository(),
+        vector_store=get_vector_store_repository()
+    )
+
+
+@lru_cache()
+def get_search_use_case() -> SearchStoriesUseCase:
+    """Get search use case with dependencies (singleton)"""
+    return SearchStoriesUseCase(
+        embedding_service=get_embedding_repository(),
+        vector_store=get_vector_store_repository()
+    )
+
+
+@lru_cache()
+def get_generate_use_case() -> GenerateResponseUseCase:
+    """Get generate response use case with dependencies (singleton)"""
+    return GenerateResponseUseCase(
+        search_use_case=get_search_use_case(),
+        llm_service=get_llm_repository()
+    )
@@ -1,6 +1,6 @@
 """Application settings using Pydantic"""
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -9,13 +9,42 @@ class Settings(BaseSettings):
     chroma_db_path: str = "./chroma_db"
     openai_model: str = "gpt-4-turbo-preview"
     embedding_model: str = "text-embedding-3-small"
+    embedding_backend: Literal["openai", "onnx"] = "openai"  # onnx runs a local model; re-ingest after switching
+    onnx_model_path: Optional[str] = None  # e.g. bge-small-en-v1.5 model_quantized.onnx
+    onnx_tokenizer_path: Optional[str] = None  # tokenizer.json of the same model
+    onnx_model_id: Optional[str] = None  # Embedding cache key for the model (default: digest of its files)
+    onnx_pooling: Literal["cls", "mean"] = "cls"  # bge models use cls, most others mean
+    onnx_batch_size: int = 32  # Texts per ONNX inference
+    onnx_num_sessions: Optional[int] = None  # Pooled ONNX sessions (default: one per 4 CPUs)
+    openai_requests_per_minute: int = 3000  # Client-side request budget (0 disables rate limiting)
+    openai_tokens_per_minute: int = 1_000_000  # Client-side token budget
+    openai_max_retries: int = 5  # Retries after a 429 before giving up
+    embedding_cache_enabled: bool = True  # Reuse embeddings of previously seen text
+    embedding_cache_path: str = "./embedding_cache.db"  # SQLite file for cached embeddings
+    embedding_dtype: Literal["float32", "int8"] = "float32"  # Cached embedding storage; int8 is quantized
+    embedding_micro_batch_wait_ms: float = 10.0  # Coalescing window for concurrent query embeddings (0 disables)
+    embedding_micro_batch_size: int = 32  # Maximum query embeddings per coalesced batch
+    query_embedding_cache_size: int = 4096  # Recent query embeddings kept in memory (0 disables)
+    semantic_cache_enabled: bool = False  # Reuse embeddings of near-duplicate chunks
+    semantic_cache_threshold: float = 0.97  # Minimum estimated Jaccard similarity for reuse
+    response_cache_enabled: bool = True  # Reuse answers to repeated or paraphrased queries
+    response_cache_threshold: float = 0.92  # Minimum query cosine similarity for reuse
+    response_cache_ttl_seconds: int = 3600
+    response_cache_max_entries: int = 1024
+    search_response_cache_enabled: bool = False  # Skip search and generation for paraphrased /api/search queries (answers may not match the current top-k)
+    search_response_cache_threshold: float = 0.97  # Minimum query cosine similarity for reuse
+    search_response_cache_max_entries: int = 512
     chunk_size: int = 1000  # Legacy parameter, kept for compatibility
     chunk_overlap: int = 200  # Legacy parameter, kept for compatibility
     min_words: int = 1  # Minimum words per chunk
     max_words: int = 300  # Maximum words per chunk
     overlap_words: int = 50  # Number of words to overlap between chunks
     collection_name: str = "story_chunks"
-    data_dir: str = "./data"  # Directory containing preloaded story files
+    hnsw_search_ef: int = 32  # HNSW candidates examined per query; keep above the largest top_k
+    search_cache_ttl_seconds: int = 300  # Lifetime of cached search results (0 disables the cache)
+    search_cache_max_entries: int = 1024
+    pdf_backend: Literal["pypdf", "pymupdf"] = "pymupdf"  # pypdf avoids the AGPL PyMuPDF dependency
+    data_dir: str = "./data"  # Story files: preloaded on startup, uploads saved here (tmpfs works)
     
     class Config:
         env_file = ".env"
@@ -2,6 +2,7 @@
 from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
+import numpy as np
 
 
 @dataclass
@@ -10,7 +11,7 @@ class StoryChunk:
     id: str
     content: str
     metadata: dict
-    embedding: Optional[list[float]] = None
+    embedding: Optional[np.ndarray] = None  # float32 vector
     
     def __post_init__(self):
         """Validate chunk data"""
@@ -1,6 +1,7 @@
 """Repository interfaces following Dependency Inversion Principle"""
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, Iterable, List, Optional
+import numpy as np
 from src.domain.models import StoryChunk, SearchResult
 
 
@@ -15,7 +16,7 @@ class VectorStoreRepository(ABC):
     @abstractmethod
     async def search_similar(
         self, 
-        query_embedding: List[float], 
+        query_embedding: np.ndarray, 
         top_k: int = 3
     ) -> List[SearchResult]:
         """Search for similar chunks using embedding similarity"""
@@ -26,26 +27,40 @@ class VectorStoreRepository(ABC):
         """Retrieve a chunk by its ID"""
         pass
     
+    @abstractmethod
+    async def delete_chunks(self, chunk_ids: List[str]) -> None:
+        """Delete the chunks with the given IDs (unknown IDs are ignored)"""
+        pass
+    
+    @abstractmethod
+    async def delete_by_source(self, source: str, keep_ids: Optional[Iterable[str]] = None) -> None:
+        """Delete every chunk ingested from the given source, except those in keep_ids"""
+        pass
+    
     @abstractmethod
     async def clear_all(self) -> None:
         """Clear all chunks from the store"""
         pass
+    
+    async def warm_up(self) -> None:
+        """Load the index ahead of the first query (no-op by default)"""
+        pass
 
 
 class EmbeddingRepository(ABC):
     """Interface for embedding generation"""
     
     @abstractmethod
-    async def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for a text string"""
+    async def generate_embedding(self, text: str) -> np.ndarray:
+        """Generate a float32 embedding for a text string"""
         pass
     
     @abstractmethod
     async def generate_embeddings_batch(
         self, 
         texts: List[str]
-    ) -> List[List[float]]:
-        """Generate embeddings for multiple texts"""
+    ) -> List[np.ndarray]:
+        """Generate float32 embeddings for multiple texts"""
         pass
 
 
@@ -60,4 +75,12 @@ class LLMRepository(ABC):
     ) -> str:
         """Generate a response using the query and context chunks"""
         pass
+    
+    async def generate_response_stream(
+        self,
+        query: str,
+        context_chunks: List[StoryChunk]
+    ) -> AsyncIterator[str]:
+        """Generate a response in pieces (by default, all at once)"""
+        yield await self.generate_response(query, context_chunks)
 
@@ -1,6 +1,6 @@
 """Domain service interfaces"""
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, List, Optional
 from src.domain.models import StoryDocument, StoryChunk
 
 
@@ -11,6 +11,26 @@ class DocumentLoaderService(ABC):
     async def load_pdf(self, file_path: str) -> StoryDocument:
         """Load a PDF file and return a StoryDocument"""
         pass
+    
+    async def stream_text(
+        self,
+        file_path: str,
+        content: Optional[bytes] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield the text of a file in pieces (by default, all at once)
+        
+        When content is given it holds the file's bytes, and file_path only
+        names the file. Loaders that can only read from disk reject it.
+        """
+        if content is not None:
+            raise NotImplementedError(f"{type(self).__name__} cannot load in-memory content")
+        document = await self.load_pdf(file_path)
+        yield document.content
+    
+    def close(self) -> None:
+        """Release the loader's resources (no-op by default)"""
+        pass
 
 
 class TextChunkingService(ABC):
@@ -25,4 +45,15 @@ class TextChunkingService(ABC):
     ) -> List[str]:
         """Split text into chunks"""
         pass
+    
+    async def chunk_stream(self, texts: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Split text that arrives in pieces into chunks
+        
+        Yields the same chunks as chunk_text on the whole text. By default
+        the pieces are joined and chunked at once.
+        """
+        pieces = [text async for text in texts]
+        for chunk in self.chunk_text("\n\n".join(pieces)):
+            yield chunk
 
@@ -1,11 +1,31 @@
-"""Text chunking implementation - splits text into word-based chunks with overlap"""
+"""Text chunking implementation - splits text into stories, then into word-based chunks with overlap"""
+import math
 import re
-from typing import List
+from typing import AsyncIterator, Iterator, List, Tuple
 from src.domain.services import TextChunkingService
 
 
 class LangChainTextChunker(TextChunkingService):
-    """Text chunking service that splits text into chunks of 1-300 words with overlap"""
+    """
+    Text chunking service that splits text into stories, then into chunks
+    of 1-300 words with overlap
+    
+    Stories are separated by empty lines. Text without empty lines is split
+    on story header lines ("Story 1:", "Chapter 2", "3. Title", ...) instead.
+    """
+    
+    _paragraph_re = re.compile(r'\n\s*\n+')
+    # Line breaks followed by a story header line: "Story 1", "Chapter 2",
+    # "Part 3", "4. Title", "IV. Title" or "# Title". One alternation,
+    # matched over the whole text; [^\S\n] is whitespace that doesn't cross
+    # a line break. Starting with a literal "\n" rather than a multiline "^"
+    # lets the regex engine jump between line breaks instead of trying a
+    # match at every character.
+    _story_header_re = re.compile(
+        r'\n[^\S\n]*(?:story[^\S\n]+\d|chapter[^\S\n]+\d|part[^\S\n]+\d'
+        r'|(?:\d+|[ivxlc]+)\.[^\S\n]+\S|#+[^\S\n]+\S)',
+        re.IGNORECASE
+    )
     
     def __init__(
         self, 
@@ -24,12 +44,26 @@ class LangChainTextChunker(TextChunkingService):
             min_words: Minimum words per chunk (default: 1)
             max_words: Maximum words per chunk (default: 300)
             overlap_words: Number of words to overlap between chunks (default: 50)
+            
+        Raises:
+            ValueError: If overlap_words is not between 0 and max_words - 1
         """
+        if max_words < 1:
+            raise ValueError("max_words must be at least 1")
+        if not 0 <= overlap_words < max_words:
+            raise ValueError("overlap_words must be at least 0 and less than max_words")
+        
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.min_words = min_words
         self.max_words = max_words
         self.overlap_words = overlap_words
+        # Words between the starts of consecutive chunks, always at least 1
+        self._stride = max_words - overlap_words
+        # Every chunk starts and ends on a multiple of this many words, so
+        # words are located in groups of it rather than one at a time
+        self._group_words = math.gcd(self._stride, max_words)
+        self._word_group_re = re.compile(r'\S+(?:\s+\S+){0,%d}' % (self._group_words - 1))
     
     def _count_words(self, text: str) -> int:
         """Count the number of words in text"""
@@ -39,16 +73,84 @@ class LangChainTextChunker(TextChunkingService):
         words = [w for w in text.split() if w.strip()]
         return len(words)
     
-    def _split_into_words(self, text: str) -> List[str]:
-        """Split text into words while preserving word boundaries"""
-        if not text or not text.strip():
-            return []
-        # Split by whitespace and filter out empty strings
-        return [w for w in text.split() if w.strip()]
+    def _paragraph_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield the (start, end) offsets of the text between empty lines"""
+        start = 0
+        for gap in self._paragraph_re.finditer(text):
+            if gap.start() > start:
+                yield start, gap.start()
+            start = gap.end()
+        if start < len(text):
+            yield start, len(text)
     
-    def _words_to_text(self, words: List[str], start_idx: int, end_idx: int) -> str:
-        """Convert a slice of words back to text"""
-        return ' '.join(words[start_idx:end_idx])
+    def _stories(self, text: str) -> List[str]:
+        """Return the non-empty, stripped stories between empty lines"""
+        # One regex pass finds the empty-line story gaps; only the stories
+        # themselves are sliced out of the text
+        stories = []
+        for start, end in self._paragraph_spans(text):
+            story = text[start:end].strip()
+            if story:
+                stories.append(story)
+        return stories
+    
+    def _word_group_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Return the (start, end) offsets of each run of _group_words words
+        
+        The last run may hold fewer words.
+        """
+        return [m.span() for m in self._word_group_re.finditer(text)]
+    
+    def _find_story_boundaries(self, text: str) -> List[str]:
+        """Split text into stories at lines that look like story headers"""
+        # The first story starts at 0 whether or not it has a header, and
+        # every later one on the line after a matched line break
+        starts = [0]
+        starts.extend(m.start() + 1 for m in self._story_header_re.finditer(text))
+        starts.append(len(text))
+        
+        stories = (text[start:end].strip() for start, end in zip(starts, starts[1:]))
+        return [story for story in stories if story]
+    
+    def _split_story(self, text: str) -> List[str]:
+        """
+        Split a single story into chunks of at most max_words words with overlap
+        
+        Args:
+            text: Story text (already stripped)
+            
+        Returns:
+            List of text chunks
+        """
+        # If text is shorter than max_words, return as single chunk.
+        # split() stops after max_words separators, so this never scans
+        # or allocates more than one chunk's worth of words.
+        if len(text.split(maxsplit=self.max_words)) <= self.max_words:
+            return [text]
+        
+        # Locate word groups once; chunks are sliced straight out of the
+        # original text
+        spans = self._word_group_spans(text)
+        group = self._group_words
+        last_start, last_end = spans[-1]
+        total_words = (len(spans) - 1) * group + len(text[last_start:last_end].split())
+        
+        chunks = []
+        
+        # Next chunk starts at current end minus overlap
+        for start_idx in range(0, total_words, self._stride):
+            end_idx = min(start_idx + self.max_words, total_words)
+            
+            # Only add chunk if it meets minimum word requirement
+            if end_idx - start_idx >= self.min_words:
+                chunks.append(text[spans[start_idx // group][0]:spans[(end_idx - 1) // group][1]])
+            
+            # If we've reached the end, break
+            if end_idx >= total_words:
+                break
+        
+        return chunks if chunks else [text]
     
     def chunk_text(
         self, 
@@ -57,7 +159,7 @@ class LangChainTextChunker(TextChunkingService):
         chunk_overlap: int = None
     ) -> List[str]:
         """
-        Split text into chunks of 1-300 words with overlap.
+        Split text into stories, then into chunks of 1-300 words with overlap.
         
         Args:
             text: Text to chunk
@@ -70,43 +172,49 @@ class LangChainTextChunker(TextChunkingService):
         if not text or not text.strip():
             return []
         
-        # Split text into words
-        words = self._split_into_words(text)
-        total_words = len(words)
+        stories = self._stories(text)
         
-        if total_words == 0:
-            return []
-        
-        # If text is shorter than max_words, return as single chunk
-        if total_words <= self.max_words:
-            return [text.strip()]
+        # No empty lines between stories, look for story headers instead
+        if len(stories) == 1:
+            stories = self._find_story_boundaries(stories[0])
         
         chunks = []
-        start_idx = 0
+        for story in stories:
+            chunks.extend(self._split_story(story))
         
-        while start_idx < total_words:
-            # Calculate end index for this chunk
-            end_idx = min(start_idx + self.max_words, total_words)
-            
-            # Extract chunk
-            chunk_words = words[start_idx:end_idx]
-            chunk_text = self._words_to_text(words, start_idx, end_idx)
-            
-            # Only add chunk if it meets minimum word requirement
-            if len(chunk_words) >= self.min_words:
-                chunks.append(chunk_text.strip())
-            
-            # If we've reached the end, break
-            if end_idx >= total_words:
-                break
-            
-            # Move start index forward, accounting for overlap
-            # Next chunk starts at current end minus overlap
-            start_idx = max(start_idx + 1, end_idx - self.overlap_words)
+        return chunks
+    
+    async def chunk_stream(self, texts: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Split text that arrives in pieces into chunks
+        
+        Yields the same chunks as chunk_text on the whole text, without ever
+        holding it. Pieces must break at empty lines, as the pieces of
+        DocumentLoaderService.stream_text do. The first story is held back
+        until a second one shows that the text has empty lines; a text made
+        of a single story is split at story header lines instead.
+        
+        Args:
+            texts: Pieces of the text
             
-            # Safety check to prevent infinite loops
-            if start_idx >= end_idx:
-                start_idx = end_idx
+        Yields:
+            Text chunks, each containing 1-300 words with overlap
+        """
+        first = None
+        has_empty_lines = False
+        async for text in texts:
+            for story in self._stories(text):
+                if not has_empty_lines:
+                    if first is None:
+                        first = story
+                        continue
+                    has_empty_lines = True
+                    for chunk in self._split_story(first):
+                        yield chunk
+                for chunk in self._split_story(story):
+                    yield chunk
         
-        return chunks if chunks else [text.strip()]
-
+        if first is not None and not has_empty_lines:
+            for story in self._find_story_boundaries(first):
+                for chunk in self._split_story(story):
+                    yield chunk
@@ -1,19 +1,183 @@
 """Document loader implementation for PDF and TXT files"""
+import asyncio
+import io
+import mmap
+import multiprocessing
 import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Iterator, List, Optional, Union
 from pypdf import PdfReader
 from src.domain.services import DocumentLoaderService
 from src.domain.models import StoryDocument
 
+# TXT files at least this large are decoded from a memory map
+MMAP_THRESHOLD_BYTES = 50 * 1024 * 1024
+
+# Streamed TXT paragraphs are read in worker threads, about this many
+# characters per thread hop
+STREAM_BATCH_CHARS = 1 << 20
+
+_PARAGRAPH_GAP_RE = re.compile(rb'\n\s*\n')
+
+
+def _extract_pdf_text_pymupdf(source: Union[str, bytes]) -> str:
+    """Extract the text of every page of a PDF using PyMuPDF"""
+    import pymupdf
+    
+    if isinstance(source, bytes):
+        doc = pymupdf.open(stream=source, filetype="pdf")
+    else:
+        doc = pymupdf.open(source)
+    with doc:
+        return "\n".join(page.get_text("text") for page in doc)
+
+
+def _extract_pdf_text(source: Union[str, bytes], backend: str = "pypdf") -> str:
+    """
+    Extract the text of every page of a PDF (runs in a worker process)
+    
+    Args:
+        source: Path to the PDF file, or the PDF's bytes
+        backend: "pymupdf" or "pypdf"; falls back to pypdf when PyMuPDF
+            is not installed
+    """
+    if backend == "pymupdf":
+        try:
+            return _extract_pdf_text_pymupdf(source)
+        except ImportError:
+            pass
+    
+    reader = PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+    text_content = []
+    
+    for page in reader.pages:
+        text_content.append(page.extract_text())
+    
+    if len(text_content) == 1:
+        return text_content[0]
+    return "\n".join(text_content)
+
+
+def _read_text_file(file_path: str) -> str:
+    """Read a UTF-8 text file in as few copies as possible"""
+    path = Path(file_path)
+    if path.stat().st_size < MMAP_THRESHOLD_BYTES:
+        return path.read_text(encoding='utf-8', errors='replace')
+    
+    # Decode large files straight from the mapped pages, skipping the
+    # intermediate bytes object that read() would allocate
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, 'utf-8', 'replace')
+
+
+def _iter_paragraphs(buffer: Union[bytes, mmap.mmap]) -> Iterator[str]:
+    """Yield the empty-line separated paragraphs of UTF-8 bytes lazily"""
+    start = 0
+    for gap in _PARAGRAPH_GAP_RE.finditer(buffer):
+        yield buffer[start:gap.start()].decode('utf-8', 'replace')
+        start = gap.end()
+    yield buffer[start:].decode('utf-8', 'replace')
+
+
+def _iter_text_paragraphs(file_path: str) -> Iterator[str]:
+    """Yield the empty-line separated paragraphs of a UTF-8 text file lazily"""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from _iter_paragraphs(mm)
+
+
+def _next_paragraphs(paragraphs: Iterator[str], max_chars: int) -> List[str]:
+    """Take paragraphs from the iterator until about max_chars characters"""
+    batch = []
+    size = 0
+    for paragraph in paragraphs:
+        batch.append(paragraph)
+        size += len(paragraph)
+        if size >= max_chars:
+            break
+    return batch
+
+
+async def _iter_in_thread(paragraphs: Iterator[str]) -> AsyncIterator[str]:
+    """Advance a paragraph iterator in worker threads, keeping the scan off the event loop"""
+    # Held while a worker advances the iterator. Cancelling the consumer
+    # doesn't stop that worker, and a running generator can't be closed.
+    lock = threading.Lock()
+    
+    def next_batch() -> List[str]:
+        with lock:
+            return _next_paragraphs(paragraphs, STREAM_BATCH_CHARS)
+    
+    def close() -> None:
+        with lock:
+            paragraphs.close()
+    
+    try:
+        while batch := await asyncio.to_thread(next_batch):
+            for paragraph in batch:
+                yield paragraph
+    finally:
+        if lock.acquire(blocking=False):
+            try:
+                paragraphs.close()
+            finally:
+                lock.release()
+        else:
+            # Closed by another worker once the abandoned scan finishes
+            asyncio.get_running_loop().run_in_executor(None, close)
+
 
 class PDFDocumentLoader(DocumentLoaderService):
     """Loads PDF and TXT documents and extracts text"""
     
+    def __init__(self, pdf_backend: str = "pymupdf", max_workers: Optional[int] = None):
+        """
+        Initialize the document loader
+        
+        Args:
+            pdf_backend: PDF parser to use, "pymupdf" (fast) or "pypdf"
+            max_workers: Number of processes used for PDF extraction
+                (defaults to the number of CPUs)
+        """
+        if pdf_backend not in ("pymupdf", "pypdf"):
+            raise ValueError(f"Unsupported PDF backend: {pdf_backend}. Supported: pymupdf, pypdf")
+        self.pdf_backend = pdf_backend
+        self.max_workers = max_workers or os.cpu_count()
+        self._pool = None
+    
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """Lazy initialization of the PDF extraction process pool"""
+        if self._pool is None:
+            # Workers are spawned rather than forked: forking a process that
+            # already runs Chroma, ONNX Runtime and to_thread workers can
+            # copy a held lock into the child and deadlock it
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+    
+    def close(self) -> None:
+        """Shut down the PDF extraction processes, cancelling queued work"""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+    
     async def load_pdf(self, file_path: str) -> StoryDocument:
         """
         Load a PDF or TXT file and extract text content
         
+        No file work runs on the event loop: TXT files are read in a worker
+        thread, and PDF parsing, which is CPU-bound, runs in a process pool so
+        several PDFs can be parsed in parallel.
+        
         Args:
             file_path: Path to the PDF or TXT file
             
@@ -37,17 +201,13 @@ class PDFDocumentLoader(DocumentLoaderService):
         try:
             if file_ext == '.txt':
                 # Load text file
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    full_text = f.read()
+                full_text = await asyncio.to_thread(_read_text_file, file_path)
             elif file_ext == '.pdf':
                 # Load PDF file
-                reader = PdfReader(file_path)
-                text_content = []
-                
-                for page in reader.pages:
-                    text_content.append(page.extract_text())
-                
-                full_text = "\n".join(text_content)
+                loop = asyncio.get_running_loop()
+                full_text = await loop.run_in_executor(
+                    self.pool, _extract_pdf_text, file_path, self.pdf_backend
+                )
             else:
                 raise ValueError(f"Unsupported file type: {file_ext}. Supported: .txt, .pdf")
             
@@ -58,4 +218,62 @@ class PDFDocumentLoader(DocumentLoaderService):
             )
         except Exception as e:
             raise ValueError(f"Error reading file {file_path}: {str(e)}")
-
+    
+    async def stream_text(
+        self,
+        file_path: str,
+        content: Optional[bytes] = None
+    ) -> AsyncIterator[str]:
+        """
+        Yield the text of a PDF or TXT file in pieces
+        
+        TXT files are memory-mapped and yielded one empty-line separated
+        paragraph at a time, so the whole file is never held as one string.
+        The paragraphs are found and decoded in worker threads. PDFs are
+        yielded as a single piece.
+        
+        Args:
+            file_path: Path to the PDF or TXT file
+            content: The file's bytes, parsed instead of reading file_path
+                (which then only names the file and need not exist)
+            
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            ValueError: If file cannot be read
+        """
+        if content is not None:
+            async for text in self._stream_content(file_path, content):
+                yield text
+            return
+        
+        if Path(file_path).suffix.lower() != '.txt':
+            document = await self.load_pdf(file_path)
+            yield document.content
+            return
+        
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        try:
+            async for paragraph in _iter_in_thread(_iter_text_paragraphs(file_path)):
+                yield paragraph
+        except Exception as e:
+            raise ValueError(f"Error reading file {file_path}: {str(e)}")
+    
+    async def _stream_content(self, file_path: str, content: bytes) -> AsyncIterator[str]:
+        """Yield the text of an in-memory PDF or TXT file in pieces"""
+        file_ext = Path(file_path).suffix.lower()
+        try:
+            if file_ext == '.txt':
+                if content:
+                    async for paragraph in _iter_in_thread(_iter_paragraphs(content)):
+                        yield paragraph
+            elif file_ext == '.pdf':
+                loop = asyncio.get_running_loop()
+                yield await loop.run_in_executor(
+                    self.pool, _extract_pdf_text, content, self.pdf_backend
+                )
+            else:
+                raise ValueError(f"Unsupported file type: {file_ext}. Supported: .txt, .pdf")
+        except Exception as e:
+            raise ValueError(f"Error reading file {file_path}: {str(e)}")
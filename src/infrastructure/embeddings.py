@@ -1,24 +1,125 @@
-"""OpenAI embedding service implementation"""
-from typing import List
-from openai import AsyncOpenAI
+"""OpenAI embedding service implementation and embedding cache"""
+import asyncio
+import hashlib
+import logging
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.infrastructure.openai_client import get_openai_client
+from src.infrastructure.rate_limiter import RateLimiter
 from src.domain.repositories import EmbeddingRepository
 
+logger = logging.getLogger(__name__)
+
+
+def _encode_vector(vec: np.ndarray, dtype: str = "float32") -> bytes:
+    """
+    Serialize an embedding for the cache
+    
+    int8 vectors are quantized symmetrically and stored as a float32 scale
+    followed by the int8 values, a quarter of the float32 size.
+    """
+    if dtype == "int8":
+        max_abs = float(np.abs(vec).max()) if vec.size else 0.0
+        scale = max_abs / 127.0 if max_abs else 1.0
+        quantized = np.round(vec / scale).astype(np.int8)
+        return np.float32(scale).tobytes() + quantized.tobytes()
+    return vec.astype(np.float32, copy=False).tobytes()
+
+
+def _decode_vector(blob: bytes, dim: int) -> np.ndarray:
+    """Deserialize a cached embedding back to float32"""
+    if len(blob) == dim * 4:
+        return np.frombuffer(blob, dtype=np.float32)
+    scale = np.frombuffer(blob[:4], dtype=np.float32)[0]
+    return np.frombuffer(blob[4:], dtype=np.int8).astype(np.float32) * scale
+
 
 class OpenAIEmbeddingService(EmbeddingRepository):
     """OpenAI embedding service"""
     
-    def __init__(self, api_key: str, model_name: str = "text-embedding-3-small"):
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "text-embedding-3-small",
+        max_batch_size: int = 256,
+        max_batch_tokens: int = 250_000,
+        max_concurrency: int = 8,
+        rate_limiter: Optional[RateLimiter] = None
+    ):
         """
         Initialize OpenAI embedding service
         
         Args:
             api_key: OpenAI API key
             model_name: Name of the embedding model to use
+            max_batch_size: Maximum number of texts per embeddings request
+            max_batch_tokens: Approximate token budget per embeddings request
+            max_concurrency: Maximum number of embeddings requests in flight
+            rate_limiter: Limiter that paces requests to the account's limits
         """
-        self.client = AsyncOpenAI(api_key=api_key)
+        # The rate limiter retries rate-limited requests itself; SDK retries
+        # underneath it would multiply the attempts
+        self.client = get_openai_client(api_key, max_retries=0 if rate_limiter else None)
         self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter
+    
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Approximate the token count of a text (~4 characters per token)"""
+        return len(text) // 4 + 1
+    
+    def _pack_batches(self, texts: List[str]) -> List[Tuple[int, List[str]]]:
+        """
+        Greedily pack texts into sub-batches bounded by count and token budget
+        
+        Args:
+            texts: Non-empty texts to pack
+            
+        Returns:
+            List of (offset, batch) pairs, where offset is the index of the
+            batch's first text in the input list
+        """
+        batches = []
+        current = []
+        current_tokens = 0
+        offset = 0
+        
+        for text in texts:
+            tokens = self._estimate_tokens(text)
+            if current and (
+                len(current) >= self.max_batch_size
+                or current_tokens + tokens > self.max_batch_tokens
+            ):
+                batches.append((offset, current))
+                offset += len(current)
+                current = []
+                current_tokens = 0
+            current.append(text)
+            current_tokens += tokens
+        
+        if current:
+            batches.append((offset, current))
+        
+        return batches
     
-    async def generate_embedding(self, text: str) -> List[float]:
+    async def _create_embeddings(self, texts, tokens: int):
+        """Make one embeddings request, through the rate limiter if there is one"""
+        if self.rate_limiter is None:
+            return await self.client.embeddings.create(model=self.model_name, input=texts)
+        return await self.rate_limiter.call(
+            self.client.embeddings.create,
+            tokens=tokens,
+            model=self.model_name,
+            input=texts
+        )
+    
+    async def generate_embedding(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text
         
@@ -26,30 +127,31 @@ class OpenAIEmbeddingService(EmbeddingRepository):
             text: Text to generate embedding for
             
         Returns:
-            List of floats representing the embedding vector
+            float32 array representing the embedding vector
         """
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
         
-        response = await self.client.embeddings.create(
-            model=self.model_name,
-            input=text
-        )
+        response = await self._create_embeddings(text, self._estimate_tokens(text))
         
-        return response.data[0].embedding
+        return np.asarray(response.data[0].embedding, dtype=np.float32)
     
     async def generate_embeddings_batch(
         self, 
         texts: List[str]
-    ) -> List[List[float]]:
+    ) -> List[np.ndarray]:
         """
         Generate embeddings for multiple texts
         
+        Texts are split into sub-batches bounded by ``max_batch_size`` and
+        ``max_batch_tokens``, which are sent concurrently (at most
+        ``max_concurrency`` requests at a time).
+        
         Args:
             texts: List of texts to generate embeddings for
             
         Returns:
-            List of embedding vectors
+            List of float32 embedding vectors
         """
         if not texts:
             return []
@@ -59,26 +161,421 @@ class OpenAIEmbeddingService(EmbeddingRepository):
         if not valid_texts:
             return []
         
-        response = await self.client.embeddings.create(
-            model=self.model_name,
-            input=valid_texts
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def embed_batch(batch: List[str]):
+            async with semaphore:
+                return await self._create_embeddings(
+                    batch, sum(self._estimate_tokens(text) for text in batch)
+                )
+        
+        batches = self._pack_batches(valid_texts)
+        responses = await asyncio.gather(
+            *(embed_batch(batch) for _, batch in batches)
         )
         
         # Return embeddings in the same order as input
-        embeddings_dict = {
-            item.index: item.embedding 
-            for item in response.data
-        }
+        vectors = [None] * len(valid_texts)
+        for (offset, _), response in zip(batches, responses):
+            for item in response.data:
+                vectors[offset + item.index] = np.asarray(
+                    item.embedding, dtype=np.float32
+                )
         
         embeddings = []
         valid_idx = 0
         for text in texts:
             if text and text.strip():
-                embeddings.append(embeddings_dict[valid_idx])
+                embeddings.append(vectors[valid_idx])
                 valid_idx += 1
             else:
                 # For empty texts, return empty embedding (shouldn't happen in practice)
-                embeddings.append([])
+                embeddings.append(np.empty(0, dtype=np.float32))
         
         return embeddings
 
+
+class _NearDuplicateIndex:
+    """
+    In-memory MinHash LSH index of recently embedded texts
+    
+    Finds previously embedded texts whose word 3-gram Jaccard similarity
+    with a new text is above the threshold, so that their embedding can be
+    reused. The index holds at most max_entries texts, evicting the least
+    recently used.
+    """
+    
+    def __init__(self, threshold: float = 0.97, num_perm: int = 128, max_entries: int = 10_000):
+        from datasketch import MinHash, MinHashLSH
+        
+        self._minhash_cls = MinHash
+        self.num_perm = num_perm
+        self.max_entries = max_entries
+        self._lsh = MinHashLSH(threshold=threshold, num_perm=num_perm)
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+    
+    def minhash(self, text: str):
+        """Build the MinHash signature of a text's word 3-gram shingles"""
+        words = text.lower().split()
+        shingles = {
+            ' '.join(words[i:i + 3]).encode('utf-8')
+            for i in range(max(1, len(words) - 2))
+        }
+        signature = self._minhash_cls(num_perm=self.num_perm)
+        signature.update_batch(list(shingles))
+        return signature
+    
+    def query(self, signature) -> Optional[np.ndarray]:
+        """Return the embedding of a near-duplicate text, if any"""
+        for key in self._lsh.query(signature):
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        return None
+    
+    def add(self, key: bytes, signature, embedding: np.ndarray) -> None:
+        """Index an embedded text"""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        self._lsh.insert(key, signature)
+        self._entries[key] = embedding
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._lsh.remove(evicted)
+
+
+class CachedEmbeddingService(EmbeddingRepository):
+    """
+    Embedding repository decorator backed by a persistent SQLite cache
+    
+    Vectors are keyed by (model name, sha256 of the text), so identical
+    chunk content is only ever embedded once per model. Optionally, texts
+    that are near-duplicates of ones embedded earlier in the process (minor
+    edits, reformatting) reuse that embedding too.
+    """
+    
+    # Keep IN (...) clauses below SQLite's host parameter limit
+    _LOOKUP_CHUNK_SIZE = 500
+    
+    def __init__(
+        self,
+        embedding_service: EmbeddingRepository,
+        db_path: str = "./embedding_cache.db",
+        model_name: Optional[str] = None,
+        semantic_threshold: Optional[float] = None,
+        storage_dtype: str = "float32"
+    ):
+        """
+        Initialize the cached embedding service
+        
+        Args:
+            embedding_service: Underlying service used on cache misses
+            db_path: Path to the SQLite cache database
+            model_name: Model name used in cache keys (defaults to the
+                underlying service's model_name)
+            semantic_threshold: If set, reuse the embedding of a previously
+                embedded text whose estimated Jaccard similarity is at least
+                this value (requires datasketch)
+            storage_dtype: "float32" (lossless) or "int8" (quantized, 4x
+                smaller on disk)
+        """
+        if storage_dtype not in ("float32", "int8"):
+            raise ValueError(f"Unsupported embedding dtype: {storage_dtype}. Supported: float32, int8")
+        self.embedding_service = embedding_service
+        self.db_path = db_path
+        self.model_name = model_name or getattr(embedding_service, 'model_name', '')
+        self.storage_dtype = storage_dtype
+        self._conn = None
+        self._near_duplicates = (
+            _NearDuplicateIndex(threshold=semantic_threshold)
+            if semantic_threshold is not None else None
+        )
+    
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Lazy initialization of the SQLite connection"""
+        if self._conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "model TEXT, hash BLOB, dim INT, vec BLOB, "
+                "PRIMARY KEY (model, hash))"
+            )
+        return self._conn
+    
+    @staticmethod
+    def _hash(text: str) -> bytes:
+        """Hash text content for use as a cache key"""
+        return hashlib.sha256(text.encode('utf-8')).digest()
+    
+    def _lookup(self, hashes: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """Fetch cached vectors for the given hashes"""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), self._LOOKUP_CHUNK_SIZE):
+            group = unique[i:i + self._LOOKUP_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(group))
+            rows = self.conn.execute(
+                f"SELECT hash, dim, vec FROM cache WHERE model=? AND hash IN ({placeholders})",
+                [self.model_name, *group]
+            )
+            for key, dim, blob in rows:
+                found[key] = _decode_vector(blob, dim)
+        return found
+    
+    def _store(self, items: List[Tuple[bytes, np.ndarray]]) -> None:
+        """Persist newly generated vectors"""
+        rows = [
+            (self.model_name, key, vec.shape[0], _encode_vector(vec, self.storage_dtype))
+            for key, vec in items
+        ]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO cache (model, hash, dim, vec) VALUES (?, ?, ?, ?)",
+                rows
+            )
+    
+    async def generate_embedding(self, text: str) -> np.ndarray:
+        """
+        Generate embedding for a single text, using the cache when possible
+        
+        Args:
+            text: Text to generate embedding for
+            
+        Returns:
+            float32 array representing the embedding vector
+        """
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+        
+        key = self._hash(text)
+        cached = self._lookup([key])
+        if key in cached:
+            return cached[key]
+        
+        embedding = np.asarray(
+            await self.embedding_service.generate_embedding(text), dtype=np.float32
+        )
+        self._store([(key, embedding)])
+        return embedding
+    
+    async def generate_embeddings_batch(
+        self, 
+        texts: List[str]
+    ) -> List[np.ndarray]:
+        """
+        Generate embeddings for multiple texts, forwarding only cache misses
+        
+        Args:
+            texts: List of texts to generate embeddings for
+            
+        Returns:
+            List of embedding vectors in input order
+        """
+        if not texts:
+            return []
+        
+        hashes = [
+            self._hash(text) if text and text.strip() else None
+            for text in texts
+        ]
+        cached = self._lookup([key for key in hashes if key is not None])
+        
+        # Forward each distinct missing text once
+        misses = {}
+        for text, key in zip(texts, hashes):
+            if key is not None and key not in cached and key not in misses:
+                misses[key] = text
+        
+        signatures = {}
+        if self._near_duplicates is not None:
+            for key, text in list(misses.items()):
+                signatures[key] = self._near_duplicates.minhash(text)
+                embedding = self._near_duplicates.query(signatures[key])
+                if embedding is not None:
+                    logger.debug("Reusing near-duplicate embedding for chunk %s", key.hex()[:12])
+                    cached[key] = embedding
+                    del misses[key]
+        
+        if misses:
+            miss_keys = list(misses)
+            new_embeddings = await self.embedding_service.generate_embeddings_batch(
+                [misses[key] for key in miss_keys]
+            )
+            new_items = [
+                (key, np.asarray(vec, dtype=np.float32))
+                for key, vec in zip(miss_keys, new_embeddings)
+            ]
+            self._store(new_items)
+            cached.update(new_items)
+            
+            if self._near_duplicates is not None:
+                for key, embedding in new_items:
+                    self._near_duplicates.add(key, signatures[key], embedding)
+        
+        empty = np.empty(0, dtype=np.float32)
+        return [cached[key] if key is not None else empty for key in hashes]
+
+
+class MicroBatchingEmbeddingService(EmbeddingRepository):
+    """
+    Embedding repository decorator that coalesces concurrent single-text
+    requests into batch requests
+    
+    A single-text request waits at most max_wait_ms for others to join it,
+    and a batch is sent as soon as it holds max_batch_size texts. Batch
+    requests are passed straight through.
+    """
+    
+    def __init__(
+        self,
+        embedding_service: EmbeddingRepository,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 10.0
+    ):
+        """
+        Initialize the micro-batching embedding service
+        
+        Args:
+            embedding_service: Underlying service that embeds each batch
+            max_batch_size: Maximum number of texts per coalesced batch
+            max_wait_ms: Longest a request waits for others to join its batch
+        """
+        self.embedding_service = embedding_service
+        self.model_name = getattr(embedding_service, 'model_name', '')
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Strong references to in-flight batches, which the event loop doesn't keep
+        self._tasks = set()
+    
+    async def generate_embedding(self, text: str) -> np.ndarray:
+        """
+        Generate embedding for a single text as part of a coalesced batch
+        
+        Args:
+            text: Text to generate embedding for
+            
+        Returns:
+            float32 array representing the embedding vector
+        """
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+    
+    def _flush(self) -> None:
+        """Send the pending texts as one batch"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.ensure_future(self._embed_pending(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _embed_pending(self, pending: List[Tuple[str, asyncio.Future]]) -> None:
+        """Embed a coalesced batch and resolve its requests"""
+        try:
+            vectors = await self.embedding_service.generate_embeddings_batch(
+                [text for text, _ in pending]
+            )
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), vector in zip(pending, vectors):
+            if not future.done():
+                future.set_result(vector)
+    
+    async def generate_embeddings_batch(
+        self,
+        texts: List[str]
+    ) -> List[np.ndarray]:
+        """
+        Generate embeddings for multiple texts
+        
+        Args:
+            texts: List of texts to generate embeddings for
+            
+        Returns:
+            List of float32 embedding vectors
+        """
+        return await self.embedding_service.generate_embeddings_batch(texts)
+
+
+class QueryEmbeddingLRU(EmbeddingRepository):
+    """
+    Embedding repository decorator that keeps the embeddings of recently
+    seen single texts (search queries) in memory
+    
+    Repeated queries are answered from a dict lookup without touching the
+    persistent cache or waiting for a micro-batch. Batch requests (ingest)
+    are passed straight through so they don't evict the queries.
+    """
+    
+    def __init__(self, embedding_service: EmbeddingRepository, max_entries: int = 4096):
+        """
+        Initialize the query embedding LRU
+        
+        Args:
+            embedding_service: Underlying service used on misses
+            max_entries: Maximum number of embeddings kept (least recently
+                used entries are evicted first)
+        """
+        self.embedding_service = embedding_service
+        self.model_name = getattr(embedding_service, 'model_name', '')
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+    
+    async def generate_embedding(self, text: str) -> np.ndarray:
+        """
+        Generate embedding for a single text, reusing a recent result
+        
+        Args:
+            text: Text to generate embedding for
+            
+        Returns:
+            float32 array representing the embedding vector (read-only, as
+            it is shared between callers)
+        """
+        embedding = self._entries.get(text)
+        if embedding is not None:
+            self._entries.move_to_end(text)
+            return embedding
+        
+        embedding = np.array(await self.embedding_service.generate_embedding(text), dtype=np.float32)
+        embedding.setflags(write=False)
+        self._entries[text] = embedding
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return embedding
+    
+    async def generate_embeddings_batch(
+        self,
+        texts: List[str]
+    ) -> List[np.ndarray]:
+        """
+        Generate embeddings for multiple texts
+        
+        Args:
+            texts: List of texts to generate embeddings for
+            
+        Returns:
+            List of float32 embedding vectors
+        """
+        return await self.embedding_service.generate_embeddings_batch(texts)
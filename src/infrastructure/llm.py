@@ -1,23 +1,55 @@
-"""OpenAI LLM service implementation"""
-from typing import List
-from openai import AsyncOpenAI
-from src.domain.repositories import LLMRepository
+"""OpenAI LLM service implementation and response cache"""
+import asyncio
+import hashlib
+import json
+from typing import AsyncIterator, List, Optional, Tuple
+from src.infrastructure.openai_client import get_openai_client
+from src.domain.repositories import EmbeddingRepository, LLMRepository
 from src.domain.models import StoryChunk
+from src.infrastructure.rate_limiter import RateLimiter
+from src.infrastructure.semantic_cache import SemanticCache
+
+# Static instructions come first and are identical for every request, so the
+# provider can serve them from its prompt cache; only the user message varies.
+SYSTEM_PROMPT = """You are a story retriever. When asked for a story or type of story, 
+return the story content directly without any commentary, explanation, or personal take. 
+Do not address the user or use phrases like "I", "you", "based on", or "the story says". 
+Simply present the story as it is. Write in third person narrative style only.
+Return the story content directly without commentary or addressing the user."""
+
+USER_PROMPT_TEMPLATE = """Query: {query}
+
+Story Excerpts:
+{context}"""
+
+NO_STORIES_RESPONSE = "No relevant stories found."
+
+# Batch statuses after which a batch will make no further progress
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
 
 
 class OpenAILLMService(LLMRepository):
     """OpenAI LLM service for generating responses"""
     
-    def __init__(self, api_key: str, model_name: str = "gpt-4-turbo-preview"):
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "gpt-4-turbo-preview",
+        rate_limiter: Optional[RateLimiter] = None
+    ):
         """
         Initialize OpenAI LLM service
         
         Args:
             api_key: OpenAI API key
             model_name: Name of the model to use
+            rate_limiter: Limiter that paces requests to the account's limits
         """
-        self.client = AsyncOpenAI(api_key=api_key)
+        # The rate limiter retries rate-limited requests itself; SDK retries
+        # underneath it would multiply the attempts
+        self.client = get_openai_client(api_key, max_retries=0 if rate_limiter else None)
         self.model_name = model_name
+        self.rate_limiter = rate_limiter
     
     async def generate_response(
         self,
@@ -35,35 +67,265 @@ class OpenAILLMService(LLMRepository):
             Generated response string
         """
         if not context_chunks:
-            return "No relevant stories found."
+            return NO_STORIES_RESPONSE
         
-        # Build context from chunks without source labels
-        context_parts = []
-        for chunk in context_chunks:
-            context_parts.append(chunk.content)
+        response = await self._create_completion(
+            self._build_messages(query, context_chunks)
+        )
         
-        context = "\n\n---\n\n".join(context_parts)
+        return response.choices[0].message.content
+    
+    async def generate_response_stream(
+        self,
+        query: str,
+        context_chunks: List[StoryChunk]
+    ) -> AsyncIterator[str]:
+        """
+        Generate a response, yielding text as the model produces it
         
-        system_prompt = """You are a story retriever. When asked for a story or type of story, 
-return the story content directly without any commentary, explanation, or personal take. 
-Do not address the user or use phrases like "I", "you", "based on", or "the story says". 
-Simply present the story as it is. Write in third person narrative style only."""
+        Args:
+            query: User's query
+            context_chunks: Relevant story chunks to use as context
+            
+        Yields:
+            Pieces of the generated response
+        """
+        if not context_chunks:
+            yield NO_STORIES_RESPONSE
+            return
         
-        user_prompt = f"""Query: {query}
-
-Story Excerpts:
-{context}
-
-Return the story content directly without commentary or addressing the user."""
+        stream = await self._create_completion(
+            self._build_messages(query, context_chunks),
+            stream=True
+        )
+        
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    async def generate_responses_batch(
+        self,
+        jobs: List[Tuple[str, List[StoryChunk]]],
+        poll_interval: float = 30.0
+    ) -> List[str]:
+        """
+        Generate responses for many queries through the OpenAI Batch API
+        
+        Batches cost half as much as regular requests and don't count
+        against the interactive rate limits, but can take up to 24 hours to
+        complete. Use this for offline jobs only; interactive requests
+        should go through generate_response.
+        
+        Args:
+            jobs: (query, context chunks) pairs
+            poll_interval: Seconds to wait between batch status checks
+            
+        Returns:
+            Generated response strings, in the same order as jobs
+            
+        Raises:
+            ValueError: If the batch or any of its requests failed
+        """
+        responses = [NO_STORIES_RESPONSE] * len(jobs)
+        lines = []
+        for i, (query, context_chunks) in enumerate(jobs):
+            if not context_chunks:
+                continue
+            lines.append(json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model_name,
+                    "messages": self._build_messages(query, context_chunks),
+                    "temperature": 0.7
+                }
+            }))
+        
+        if not lines:
+            return responses
+        
+        input_file = await self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode('utf-8')),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            await asyncio.sleep(poll_interval)
+            batch = await self.client.batches.retrieve(batch.id)
+        
+        if batch.status != "completed":
+            raise ValueError(f"Batch {batch.id} ended with status: {batch.status}")
+        
+        # Successful requests are in the output file, failed ones in the error file
+        answered = set()
+        failures = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            output = await self.client.files.content(file_id)
+            for line in output.text.splitlines():
+                if not line:
+                    continue
+                result = json.loads(line)
+                response = result.get('response') or {}
+                if response.get('status_code') != 200:
+                    error = result.get('error') or (response.get('body') or {}).get('error')
+                    failures.append(f"{result['custom_id']}: {error}")
+                    continue
+                job = int(result['custom_id'])
+                responses[job] = response['body']['choices'][0]['message']['content']
+                answered.add(job)
+        
+        if failures:
+            raise ValueError(f"Batch {batch.id} had {len(failures)} failed request(s), first {failures[0]}")
         
-        response = await self.client.chat.completions.create(
+        missing = [i for i, (_, context_chunks) in enumerate(jobs) if context_chunks and i not in answered]
+        if missing:
+            raise ValueError(f"Batch {batch.id} returned no result for job(s) {missing}")
+        
+        return responses
+    
+    async def _create_completion(self, messages: List[dict], **kwargs):
+        """Make one chat completion request, through the rate limiter if there is one"""
+        if self.rate_limiter is None:
+            return await self.client.chat.completions.create(
+                model=self.model_name,
+                messages=messages,
+                temperature=0.7,
+                **kwargs
+            )
+        # Prompt tokens estimated at ~4 characters per token
+        tokens = sum(len(message["content"]) for message in messages) // 4 + 1
+        return await self.rate_limiter.call(
+            self.client.chat.completions.create,
+            tokens=tokens,
             model=self.model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7
+            messages=messages,
+            temperature=0.7,
+            **kwargs
         )
+    
+    def _build_messages(self, query: str, context_chunks: List[StoryChunk]) -> List[dict]:
+        """Build the chat messages for a query and its context chunks"""
+        # Build context from chunks without source labels
+        context = "\n\n---\n\n".join(chunk.content for chunk in context_chunks)
         
-        return response.choices[0].message.content
+        user_prompt = USER_PROMPT_TEMPLATE.format(query=query, context=context)
+        
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
+
 
+class CachedLLMService(LLMRepository):
+    """
+    LLM repository decorator that reuses answers to the same or
+    near-identical queries
+    
+    Queries are matched exactly by (model name, query, context chunk IDs)
+    and semantically by the cosine similarity of their embeddings. A
+    semantic match must have been answered from the same context chunks, so
+    an answer is never reused once the retrieved stories change.
+    """
+    
+    def __init__(
+        self,
+        llm_service: LLMRepository,
+        embedding_service: EmbeddingRepository,
+        cache: Optional[SemanticCache] = None,
+        model_name: Optional[str] = None
+    ):
+        """
+        Initialize the cached LLM service
+        
+        Args:
+            llm_service: Underlying service used on cache misses
+            embedding_service: Service used to embed queries
+            cache: Cache holding previous answers
+            model_name: Model name used in cache keys (defaults to the
+                underlying service's model_name)
+        """
+        self.llm_service = llm_service
+        self.embedding_service = embedding_service
+        self.cache = cache or SemanticCache()
+        self.model_name = model_name or getattr(llm_service, 'model_name', '')
+    
+    def _cache_keys(self, query: str, context_chunks: List[StoryChunk]) -> Tuple[str, str]:
+        """Return the exact cache key and the digest of the context chunk IDs"""
+        context_digest = hashlib.sha256(
+            "\n".join(chunk.id for chunk in context_chunks).encode('utf-8')
+        ).hexdigest()
+        key = hashlib.sha256(
+            f"{self.model_name}\n{context_digest}\n{query}".encode('utf-8')
+        ).hexdigest()
+        return key, context_digest
+    
+    async def generate_response(
+        self,
+        query: str,
+        context_chunks: List[StoryChunk]
+    ) -> str:
+        """
+        Return a cached answer for the query, or generate and cache one
+        
+        Args:
+            query: User's query
+            context_chunks: Relevant story chunks to use as context
+            
+        Returns:
+            Generated response string
+        """
+        if not context_chunks:
+            return await self.llm_service.generate_response(query, context_chunks)
+        
+        key, context_digest = self._cache_keys(query, context_chunks)
+        query_embedding = await self.embedding_service.generate_embedding(query)
+        
+        cached = self.cache.get(key, query_embedding, lambda value: value[0] == context_digest)
+        if cached is not None:
+            return cached[1]
+        
+        response = await self.llm_service.generate_response(query, context_chunks)
+        self.cache.set(key, query_embedding, (context_digest, response))
+        return response
+    
+    async def generate_response_stream(
+        self,
+        query: str,
+        context_chunks: List[StoryChunk]
+    ) -> AsyncIterator[str]:
+        """
+        Yield a cached answer for the query at once, or stream and cache one
+        
+        Args:
+            query: User's query
+            context_chunks: Relevant story chunks to use as context
+            
+        Yields:
+            Pieces of the generated response
+        """
+        if not context_chunks:
+            async for piece in self.llm_service.generate_response_stream(query, context_chunks):
+                yield piece
+            return
+        
+        key, context_digest = self._cache_keys(query, context_chunks)
+        query_embedding = await self.embedding_service.generate_embedding(query)
+        
+        cached = self.cache.get(key, query_embedding, lambda value: value[0] == context_digest)
+        if cached is not None:
+            yield cached[1]
+            return
+        
+        pieces = []
+        async for piece in self.llm_service.generate_response_stream(query, context_chunks):
+            pieces.append(piece)
+            yield piece
+        self.cache.set(key, query_embedding, (context_digest, "".join(pieces)))
@@ -0,0 +1,196 @@
+"""Local embedding service running a (quantized) ONNX model"""
+import asyncio
+import hashlib
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import numpy as np
+from src.domain.repositories import EmbeddingRepository
+
+
+def _file_digest(*paths: str) -> str:
+    """Hex digest of the contents of the given files, read in 1 MiB pieces"""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        with open(path, 'rb') as f:
+            while piece := f.read(1 << 20):
+                digest.update(piece)
+    return digest.hexdigest()
+
+
+class ONNXEmbeddingService(EmbeddingRepository):
+    """
+    Embedding service that runs a sentence embedding model locally with
+    ONNX Runtime
+    
+    Meant for INT8-quantized exports such as BAAI/bge-small-en-v1.5 quantized
+    with `optimum-cli onnxruntime quantize --avx512_vnni`. Embeddings are the
+    L2-normalized [CLS] token state ("cls" pooling, as bge models expect) or
+    the mean of the token states ("mean" pooling).
+    
+    Inference runs in worker threads on a pool of sessions, each with its
+    own share of the CPU cores, so concurrent requests and the batches of a
+    large embedding call run side by side instead of queueing on one session.
+    There is one worker thread per session, so extra batches wait for a
+    free session instead of occupying the shared default thread pool.
+    
+    Different models produce incompatible vectors, so switching the embedding
+    backend requires re-ingesting the stories into a fresh collection.
+    """
+    
+    def __init__(
+        self,
+        model_path: str,
+        tokenizer_path: str,
+        pooling: str = "cls",
+        max_length: int = 512,
+        batch_size: int = 32,
+        num_sessions: Optional[int] = None,
+        num_threads: Optional[int] = None,
+        model_id: Optional[str] = None
+    ):
+        """
+        Initialize the ONNX embedding service
+        
+        Args:
+            model_path: Path to the .onnx model file
+            tokenizer_path: Path to the model's tokenizer.json
+            pooling: "cls" or "mean"
+            max_length: Maximum tokens per text (longer texts are truncated)
+            batch_size: Maximum texts per inference
+            num_sessions: Number of pooled inference sessions (defaults to
+                one per 4 CPUs of this worker's share)
+            num_threads: Intra-op threads per session (defaults to an even
+                share of the CPUs, split across the WEB_CONCURRENCY server
+                workers)
+            model_id: Name identifying the model in embedding cache keys
+                (defaults to a digest of the model and tokenizer files,
+                since exports are often all named model_quantized.onnx)
+        """
+        if not model_path or not tokenizer_path:
+            raise ValueError("ONNX embeddings need both a model path and a tokenizer path")
+        if pooling not in ("cls", "mean"):
+            raise ValueError(f"Unsupported pooling: {pooling}. Supported: cls, mean")
+        
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        
+        # Every server worker process loads its own sessions, so each one
+        # only gets its share of the CPUs
+        workers = max(1, int(os.environ.get("WEB_CONCURRENCY") or 1))
+        cpus = max(1, (os.cpu_count() or 1) // workers)
+        num_sessions = num_sessions or max(1, cpus // 4)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads or max(1, cpus // num_sessions)
+        options.inter_op_num_threads = 1
+        # Idle threads sleep instead of spinning, so sessions and workers
+        # don't burn each other's cores between inferences
+        options.add_session_config_entry("session.intra_op.allow_spinning", "0")
+        
+        # Idle sessions; a worker thread takes one for the duration of a run
+        self._sessions: "queue.SimpleQueue" = queue.SimpleQueue()
+        for _ in range(num_sessions):
+            session = ort.InferenceSession(
+                model_path,
+                sess_options=options,
+                providers=["CPUExecutionProvider"]
+            )
+            self._sessions.put(session)
+        self._input_names = {model_input.name for model_input in session.get_inputs()}
+        self._executor = ThreadPoolExecutor(max_workers=num_sessions, thread_name_prefix="onnx")
+        
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        # Pad each batch only to its longest text
+        self.tokenizer.enable_padding()
+        
+        # Used as the embedding cache key, so vectors of different models or
+        # poolings never mix
+        model_id = model_id or _file_digest(model_path, tokenizer_path)
+        self.model_name = f"onnx:{model_id}:{pooling}:{max_length}"
+        self.pooling = pooling
+        self.batch_size = batch_size
+    
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in a single inference, returning a (N, D) float32 array"""
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        
+        feed = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feed["token_type_ids"] = np.zeros_like(input_ids)
+        session = self._sessions.get()
+        try:
+            hidden = session.run(None, feed)[0]
+        finally:
+            self._sessions.put(session)
+        
+        if self.pooling == "cls":
+            pooled = hidden[:, 0]
+        else:
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.maximum(norms, 1e-12)).astype(np.float32)
+    
+    async def _embed_in_thread(self, texts: List[str]) -> np.ndarray:
+        """Run _embed on the session threads; inference is CPU-bound, so off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._embed, texts)
+    
+    async def generate_embedding(self, text: str) -> np.ndarray:
+        """
+        Generate embedding for a single text
+        
+        Args:
+            text: Text to generate embedding for
+            
+        Returns:
+            float32 array representing the embedding vector
+        """
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+        
+        embeddings = await self._embed_in_thread([text])
+        return embeddings[0]
+    
+    async def generate_embeddings_batch(
+        self,
+        texts: List[str]
+    ) -> List[np.ndarray]:
+        """
+        Generate embeddings for multiple texts
+        
+        Texts are embedded in length-sorted batches of at most batch_size,
+        which run concurrently on the session pool, at most one per session.
+        
+        Args:
+            texts: List of texts to generate embeddings for
+            
+        Returns:
+            List of float32 embedding vectors (empty arrays for empty texts)
+        """
+        valid_texts = [text for text in texts if text and text.strip()]
+        if not valid_texts:
+            return []
+        
+        # Group texts by length so each batch pads as little as possible
+        order = sorted(range(len(valid_texts)), key=lambda i: len(valid_texts[i]))
+        batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+        results = await asyncio.gather(*(
+            self._embed_in_thread([valid_texts[i] for i in batch])
+            for batch in batches
+        ))
+        
+        embeddings = np.empty((len(valid_texts), results[0].shape[1]), dtype=np.float32)
+        for batch, vectors in zip(batches, results):
+            embeddings[batch] = vectors
+        
+        vectors = iter(embeddings)
+        return [
+            next(vectors) if text and text.strip() else np.empty(0, dtype=np.float32)
+            for text in texts
+        ]
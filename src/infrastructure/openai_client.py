@@ -0,0 +1,58 @@
+"""Shared AsyncOpenAI clients"""
+import importlib.util
+from typing import Dict, Optional, Tuple
+import httpx
+from openai import AsyncOpenAI
+
+# HTTP/2 lets concurrent requests share one connection; it needs the h2 package
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_clients: Dict[str, AsyncOpenAI] = {}
+
+# Copies of the shared clients with other retry settings, sharing their pools
+_client_variants: Dict[Tuple[str, int], AsyncOpenAI] = {}
+
+
+def get_openai_client(api_key: str, max_retries: Optional[int] = None) -> AsyncOpenAI:
+    """
+    Get the process-wide AsyncOpenAI client for an API key
+    
+    All services using the same key share one pool of keep-alive
+    connections, whatever their retry setting.
+    
+    Args:
+        api_key: OpenAI API key
+        max_retries: Retries the SDK makes on its own (defaults to the
+            SDK's); pass 0 when a RateLimiter already retries the requests
+        
+    Returns:
+        Shared AsyncOpenAI client
+    """
+    client = _clients.get(api_key)
+    if client is None:
+        client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                timeout=httpx.Timeout(600.0, connect=5.0)
+            )
+        )
+        _clients[api_key] = client
+    
+    if max_retries is None or max_retries == client.max_retries:
+        return client
+    variant = _client_variants.get((api_key, max_retries))
+    if variant is None:
+        variant = client.with_options(max_retries=max_retries)
+        _client_variants[(api_key, max_retries)] = variant
+    return variant
+
+
+async def close_openai_clients() -> None:
+    """Close every shared client and its connections"""
+    clients = list(_clients.values())
+    _clients.clear()
+    _client_variants.clear()
+    for client in clients:
+        await client.close()
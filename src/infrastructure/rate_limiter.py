@@ -0,0 +1,121 @@
+"""Client-side rate limiting for OpenAI requests"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+logger = logging.getLogger(__name__)
+
+# Errors retried with backoff; clients used with a limiter don't retry on
+# their own, so this covers what the OpenAI SDK would otherwise retry
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests per minute and tokens per minute
+    
+    Both buckets start full and refill continuously at their per-minute limit
+    divided by 60 each second. A request waits until both buckets can cover
+    it, so bursts from concurrent callers are smoothed out to the provider's
+    limits instead of turning into 429 responses. Waiters are served in
+    arrival order.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: float = 3_000,
+        tokens_per_minute: float = 1_000_000,
+        max_retries: int = 5,
+        base_delay: float = 1.0
+    ):
+        """
+        Initialize the rate limiter
+        
+        Args:
+            requests_per_minute: Request budget per minute
+            tokens_per_minute: Token budget per minute
+            max_retries: Retries after a rate limit, connection or server error
+            base_delay: First retry delay in seconds, doubled on each retry
+        """
+        if requests_per_minute <= 0 or tokens_per_minute <= 0:
+            raise ValueError("Rate limits must be positive")
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self._available_requests = float(requests_per_minute)
+        self._available_tokens = float(tokens_per_minute)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self) -> None:
+        """Add the capacity that accrued since the last refill"""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._available_requests = min(
+            self.requests_per_minute,
+            self._available_requests + elapsed * self.requests_per_minute / 60
+        )
+        self._available_tokens = min(
+            self.tokens_per_minute,
+            self._available_tokens + elapsed * self.tokens_per_minute / 60
+        )
+    
+    async def acquire(self, tokens: int = 1) -> None:
+        """
+        Wait until one request using the given number of tokens is allowed
+        
+        Args:
+            tokens: Estimated tokens the request will consume (capped at the
+                per-minute budget so oversized requests still go through)
+        """
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._available_requests >= 1 and self._available_tokens >= tokens:
+                    self._available_requests -= 1
+                    self._available_tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._available_requests) * 60 / self.requests_per_minute,
+                    (tokens - self._available_tokens) * 60 / self.tokens_per_minute
+                )
+                await asyncio.sleep(wait)
+    
+    async def call(
+        self,
+        request: Callable[..., Awaitable[Any]],
+        *args: Any,
+        tokens: int = 1,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Make a request within the limits, retrying on rate limit errors
+        
+        Connection errors and server errors are retried too. Retries back
+        off exponentially with jitter.
+        
+        Args:
+            request: Async function making the request
+            *args: Positional arguments for the request
+            tokens: Estimated tokens the request will consume
+            **kwargs: Keyword arguments for the request
+            
+        Returns:
+            The request's result
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(tokens)
+            try:
+                return await request(*args, **kwargs)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.base_delay * (2 ** attempt) * (1 + random.random())
+                logger.warning(f"OpenAI request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
@@ -0,0 +1,129 @@
+"""In-memory semantic cache keyed by exact key and embedding similarity"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+import numpy as np
+
+
+class SemanticCache:
+    """
+    LRU cache with a TTL whose entries can also be found by embedding
+    
+    A lookup first tries the exact key, then the entry whose embedding has
+    the highest cosine similarity with the query embedding, if that
+    similarity is at least the threshold.
+    """
+    
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        ttl_seconds: float = 3600,
+        max_entries: int = 1024
+    ):
+        """
+        Initialize the semantic cache
+        
+        Args:
+            threshold: Minimum cosine similarity for a semantic hit
+            ttl_seconds: Time after which entries expire
+            max_entries: Maximum number of entries kept (least recently used
+                entries are evicted first)
+        """
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._keys = []
+        self._matrix = None
+    
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        """L2-normalize an embedding as float32"""
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+    
+    def _evict_expired(self) -> None:
+        """Drop entries older than the TTL"""
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = [key for key, (_, _, created) in self._entries.items() if created < cutoff]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+    
+    def _similarity_matrix(self) -> np.ndarray:
+        """Stack the cached embeddings into one (N, D) matrix"""
+        if self._matrix is None:
+            self._keys = list(self._entries)
+            self._matrix = np.stack([self._entries[key][0] for key in self._keys])
+        return self._matrix
+    
+    def get(
+        self,
+        key: Hashable,
+        embedding: Optional[np.ndarray] = None,
+        accept: Optional[Callable[[Any], bool]] = None
+    ) -> Optional[Any]:
+        """
+        Look up a cached value
+        
+        Args:
+            key: Exact cache key
+            embedding: Embedding used for a similarity lookup on exact misses
+            accept: Predicate a similar entry's value must satisfy to be
+                returned; the most similar accepted entry wins
+            
+        Returns:
+            The cached value, or None on a miss
+        """
+        self._evict_expired()
+        
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][1]
+        
+        if embedding is not None and self._entries:
+            similarities = self._similarity_matrix() @ self._normalize(embedding)
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            for best in candidates[np.argsort(-similarities[candidates])]:
+                best_key = self._keys[best]
+                value = self._entries[best_key][1]
+                if accept is None or accept(value):
+                    self._entries.move_to_end(best_key)
+                    self.hits += 1
+                    return value
+        
+        self.misses += 1
+        return None
+    
+    def set(self, key: Hashable, embedding: np.ndarray, value: Any) -> None:
+        """
+        Store a value
+        
+        Args:
+            key: Exact cache key
+            embedding: Embedding used for similarity lookups
+            value: Value to cache
+        """
+        self._entries[key] = (self._normalize(embedding), value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._matrix = None
+    
+    def clear(self) -> None:
+        """Remove all entries"""
+        self._entries.clear()
+        self._matrix = None
+    
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current size"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries)
+        }
@@ -1,27 +1,69 @@
 """ChromaDB vector store implementation"""
+import asyncio
+import hashlib
 import uuid
-from typing import List, Optional
+from typing import Iterable, List, Optional
+import numpy as np
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 from src.domain.repositories import VectorStoreRepository
 from src.domain.models import StoryChunk, SearchResult
+from src.infrastructure.semantic_cache import SemanticCache
+
+# Maximum number of chunks sent to Chroma in one collection.add call
+MAX_BATCH = 200
+
+# Metadata value types ChromaDB accepts as-is
+_ALLOWED_METADATA_TYPES = (str, int, float, bool)
+
+
+def _sanitize_metadata(metadata: dict) -> dict:
+    """Copy metadata, converting values ChromaDB can't store to strings"""
+    return {
+        k: v if isinstance(v, _ALLOWED_METADATA_TYPES) else str(v)
+        for k, v in metadata.items()
+    }
 
 
 class ChromaDBVectorStore(VectorStoreRepository):
-    """ChromaDB implementation of VectorStoreRepository"""
+    """
+    ChromaDB implementation of VectorStoreRepository
+    
+    Chroma's API is synchronous, so every call runs in a worker thread to
+    keep the event loop free.
+    """
     
-    def __init__(self, db_path: str = "./chroma_db", collection_name: str = "story_chunks"):
+    def __init__(
+        self,
+        db_path: str = "./chroma_db",
+        collection_name: str = "story_chunks",
+        search_ef: int = 32,
+        construction_ef: int = 128,
+        hnsw_m: int = 16,
+        query_cache: Optional[SemanticCache] = None
+    ):
         """
         Initialize ChromaDB vector store
         
         Args:
             db_path: Path to store ChromaDB database
             collection_name: Name of the collection to use
+            search_ef: HNSW candidate list size at query time (bounds the
+                work per query; must stay above the largest top_k)
+            construction_ef: HNSW candidate list size while building the index
+            hnsw_m: Maximum HNSW neighbors per node
+            query_cache: Cache of recent search results, cleared whenever
+                the collection changes
         """
         self.db_path = db_path
         self.collection_name = collection_name
+        self.search_ef = search_ef
+        self.construction_ef = construction_ef
+        self.hnsw_m = hnsw_m
+        self.query_cache = query_cache
         self._client = None
         self._collection = None
+        self._collection_lock = asyncio.Lock()
     
     @property
     def client(self):
@@ -33,18 +75,36 @@ class ChromaDBVectorStore(VectorStoreRepository):
             )
         return self._client
     
-    @property
-    def collection(self):
-        """Lazy initialization of ChromaDB collection"""
-        if self._collection is None:
+    def _open_collection(self):
+        """Get or create the collection, applying the configured search_ef"""
+        collection = self.client.get_or_create_collection(
+            name=self.collection_name,
+            metadata={
+                "description": "Story chunks for semantic search",
+                "hnsw:space": "cosine",
+                "hnsw:search_ef": self.search_ef,
+                "hnsw:construction_ef": self.construction_ef,
+                "hnsw:M": self.hnsw_m
+            }
+        )
+        # Metadata only applies to new collections; existing ones may still
+        # use Chroma's default ef_search. Before Chroma 1.0 collections have
+        # no mutable configuration, so the metadata is all there is.
+        configuration = getattr(collection, 'configuration', None)
+        hnsw = (configuration or {}).get('hnsw') or {}
+        if configuration is not None and hnsw.get('ef_search') != self.search_ef:
             try:
-                self._collection = self.client.get_collection(name=self.collection_name)
-            except Exception:
-                # Collection doesn't exist, create it
-                self._collection = self.client.create_collection(
-                    name=self.collection_name,
-                    metadata={"description": "Story chunks for semantic search"}
-                )
+                collection.modify(configuration={'hnsw': {'ef_search': self.search_ef}})
+            except TypeError:
+                pass
+        return collection
+    
+    async def _ensure_collection(self):
+        """Lazily open the collection, once even under concurrent first requests"""
+        if self._collection is None:
+            async with self._collection_lock:
+                if self._collection is None:
+                    self._collection = await asyncio.to_thread(self._open_collection)
         return self._collection
     
     async def add_chunks(self, chunks: List[StoryChunk]) -> None:
@@ -57,42 +117,81 @@ class ChromaDBVectorStore(VectorStoreRepository):
         if not chunks:
             return
         
-        # Prepare data for ChromaDB
+        # Prepare data for ChromaDB; embeddings go in one contiguous float32 array
         ids = []
-        embeddings = []
         documents = []
         metadatas = []
+        dim = len(chunks[0].embedding) if chunks[0].embedding is not None else 0
+        embeddings = np.empty((len(chunks), dim), dtype=np.float32)
         
-        for chunk in chunks:
-            if not chunk.embedding:
+        for i, chunk in enumerate(chunks):
+            if chunk.embedding is None or len(chunk.embedding) == 0:
                 raise ValueError(f"Chunk {chunk.id} must have an embedding before adding to vector store")
+            if len(chunk.embedding) != dim:
+                raise ValueError(
+                    f"Chunk {chunk.id} embedding has {len(chunk.embedding)} dimensions, expected {dim}"
+                )
             
             ids.append(chunk.id)
-            embeddings.append(chunk.embedding)
+            embeddings[i] = chunk.embedding
             documents.append(chunk.content)
             
             # Ensure metadata is serializable
-            metadata = {
-                **chunk.metadata,
-                'chunk_id': chunk.id
-            }
-            # ChromaDB requires string values for metadata
-            metadatas.append({
-                k: str(v) if not isinstance(v, (str, int, float, bool)) else v
-                for k, v in metadata.items()
-            })
-        
-        # Add to ChromaDB
-        self.collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            documents=documents,
-            metadatas=metadatas
-        )
+            metadata = _sanitize_metadata(chunk.metadata)
+            metadata['chunk_id'] = chunk.id
+            metadatas.append(metadata)
+        
+        # Add to ChromaDB in size-capped batches
+        collection = await self._ensure_collection()
+        try:
+            for i in range(0, len(ids), MAX_BATCH):
+                await asyncio.to_thread(
+                    collection.add,
+                    ids=ids[i:i + MAX_BATCH],
+                    embeddings=embeddings[i:i + MAX_BATCH],
+                    documents=documents[i:i + MAX_BATCH],
+                    metadatas=metadatas[i:i + MAX_BATCH]
+                )
+        finally:
+            # Cleared only once the batches are in, so results a search
+            # cached while they were being added don't outlive the add
+            if self.query_cache is not None:
+                self.query_cache.clear()
+    
+    async def delete_chunks(self, chunk_ids: List[str]) -> None:
+        """
+        Delete chunks from the vector store
+        
+        Args:
+            chunk_ids: IDs of the chunks to delete; unknown IDs are ignored
+        """
+        if not chunk_ids:
+            return
+        
+        collection = await self._ensure_collection()
+        try:
+            for i in range(0, len(chunk_ids), MAX_BATCH):
+                await asyncio.to_thread(collection.delete, ids=chunk_ids[i:i + MAX_BATCH])
+        finally:
+            if self.query_cache is not None:
+                self.query_cache.clear()
+    
+    async def delete_by_source(self, source: str, keep_ids: Optional[Iterable[str]] = None) -> None:
+        """
+        Delete every chunk ingested from a source
+        
+        Args:
+            source: Source recorded in the chunks' metadata (the file path)
+            keep_ids: IDs of chunks from the source to leave in place
+        """
+        collection = await self._ensure_collection()
+        found = await asyncio.to_thread(collection.get, where={"source": source}, include=[])
+        keep = set(keep_ids or ())
+        await self.delete_chunks([chunk_id for chunk_id in found['ids'] if chunk_id not in keep])
     
     async def search_similar(
         self, 
-        query_embedding: List[float], 
+        query_embedding: np.ndarray, 
         top_k: int = 3
     ) -> List[SearchResult]:
         """
@@ -105,39 +204,53 @@ class ChromaDBVectorStore(VectorStoreRepository):
         Returns:
             List of SearchResult objects sorted by relevance
         """
-        if not query_embedding:
+        if query_embedding is None or len(query_embedding) == 0:
             return []
         
-        results = self.collection.query(
+        if self.query_cache is not None:
+            key = (hashlib.blake2b(
+                np.asarray(query_embedding, dtype=np.float32).tobytes(),
+                digest_size=16
+            ).digest(), top_k)
+            cached = self.query_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        search_results = await self._query(query_embedding, top_k)
+        
+        if self.query_cache is not None:
+            self.query_cache.set(key, query_embedding, search_results)
+        return search_results
+    
+    async def _query(self, query_embedding: np.ndarray, top_k: int) -> List[SearchResult]:
+        """Run a similarity query against the collection"""
+        collection = await self._ensure_collection()
+        results = await asyncio.to_thread(
+            collection.query,
             query_embeddings=[query_embedding],
             n_results=top_k
         )
         
-        search_results = []
-        
-        if results['ids'] and len(results['ids'][0]) > 0:
-            for i, chunk_id in enumerate(results['ids'][0]):
-                distance = results['distances'][0][i] if results.get('distances') else None
-                # Convert distance to similarity score (ChromaDB uses distance, lower is better)
-                score = 1.0 - distance if distance is not None else 1.0
-                
-                # Reconstruct chunk from results
-                content = results['documents'][0][i] if results.get('documents') else ""
-                metadata = results['metadatas'][0][i] if results.get('metadatas') else {}
-                
-                chunk = StoryChunk(
-                    id=chunk_id,
-                    content=content,
-                    metadata=metadata
-                )
-                
-                search_results.append(SearchResult(
-                    chunk=chunk,
-                    score=score,
-                    rank=i + 1
-                ))
+        ids = results['ids'][0] if results['ids'] else []
+        if not ids:
+            return []
         
-        return search_results
+        # Hoist the per-result columns out of the response once
+        n = len(ids)
+        distances = (results.get('distances') or [[None] * n])[0]
+        documents = (results.get('documents') or [[""] * n])[0]
+        metadatas = (results.get('metadatas') or [[{}] * n])[0]
+        
+        # Convert distance to similarity score (ChromaDB uses distance, lower is better)
+        return [
+            SearchResult(
+                chunk=StoryChunk(id=chunk_id, content=content, metadata=metadata),
+                score=1.0 - distance if distance is not None else 1.0,
+                rank=rank
+            )
+            for rank, (chunk_id, distance, content, metadata)
+            in enumerate(zip(ids, distances, documents, metadatas), 1)
+        ]
     
     async def get_chunk_by_id(self, chunk_id: str) -> Optional[StoryChunk]:
         """
@@ -150,7 +263,8 @@ class ChromaDBVectorStore(VectorStoreRepository):
             StoryChunk if found, None otherwise
         """
         try:
-            results = self.collection.get(ids=[chunk_id])
+            collection = await self._ensure_collection()
+            results = await asyncio.to_thread(collection.get, ids=[chunk_id])
             
             if not results['ids'] or len(results['ids']) == 0:
                 return None
@@ -167,11 +281,28 @@ class ChromaDBVectorStore(VectorStoreRepository):
         except Exception:
             return None
     
+    async def warm_up(self) -> None:
+        """
+        Open the collection and run one query so the HNSW index is loaded
+        into memory before the first user query
+        """
+        collection = await self._ensure_collection()
+        
+        def warm():
+            sample = collection.get(limit=1, include=['embeddings'])
+            embeddings = sample.get('embeddings')
+            if embeddings is not None and len(embeddings) > 0:
+                collection.query(query_embeddings=[embeddings[0]], n_results=1)
+        
+        await asyncio.to_thread(warm)
+    
     async def clear_all(self) -> None:
         """Clear all chunks from the store"""
         try:
-            self.client.delete_collection(name=self.collection_name)
+            await asyncio.to_thread(self.client.delete_collection, name=self.collection_name)
             self._collection = None  # Reset collection so it gets recreated
+            if self.query_cache is not None:
+                self.query_cache.clear()
         except Exception:
             pass  # Collection might not exist
 
@@ -1,16 +1,24 @@
 """FastAPI application"""
 from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from fastapi.exception_handlers import (
     http_exception_handler,
     request_validation_exception_handler
 )
-from typing import List
+from functools import lru_cache
+from typing import Annotated, List, Optional
+import asyncio
+import gzip
+import hashlib
+import json
 import os
 import logging
 from pathlib import Path
+import aiofiles
+import orjson
+from pydantic import BaseModel, StringConstraints
 
 from src.config.dependencies import (
     get_vector_store_repository,
@@ -18,7 +26,11 @@ from src.config.dependencies import (
     get_llm_repository,
     get_document_loader_service,
     get_text_chunking_service,
-    get_settings
+    get_search_response_cache,
+    get_settings,
+    get_ingest_use_case,
+    get_search_use_case,
+    get_generate_use_case
 )
 from src.application.use_cases import (
     IngestStoriesUseCase,
@@ -31,19 +43,36 @@ from src.domain.repositories import (
     LLMRepository
 )
 from src.domain.services import DocumentLoaderService, TextChunkingService
+from src.infrastructure.llm import CachedLLMService
+from src.infrastructure.openai_client import close_openai_clients
+from src.infrastructure.semantic_cache import SemanticCache
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="JStory API", version="0.1.0")
+
+class OrjsonResponse(JSONResponse):
+    """
+    JSON response rendered with orjson, which is several times faster than
+    the standard library and serializes numpy arrays natively
+    
+    FastAPI's own ORJSONResponse is deprecated in recent releases, so the
+    render step is overridden here instead.
+    """
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+app = FastAPI(title="JStory API", version="0.1.0", default_response_class=OrjsonResponse)
 
 
 # Global exception handler to ensure all errors return JSON
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle all unhandled exceptions and return JSON"""
-    return JSONResponse(
+    return OrjsonResponse(
         status_code=500,
         content={
             "detail": str(exc),
@@ -55,34 +84,183 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors and return JSON"""
-    return JSONResponse(
+    return OrjsonResponse(
         status_code=422,
         content={"detail": exc.errors(), "body": exc.body}
     )
 
-# Create data directory if it doesn't exist
-DATA_DIR = Path("data")
-DATA_DIR.mkdir(exist_ok=True)
+# File types that can be ingested
+STORY_FILE_SUFFIXES = ('.pdf', '.txt')
+
+# Maximum number of uploaded files ingested at the same time
+MAX_CONCURRENT_INGESTS = 8
+
+# Uploads are copied to disk in pieces of this size
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Uploads up to this size are ingested from memory and saved afterwards
+IN_MEMORY_UPLOAD_MAX_BYTES = 16 << 20
+
+# Sidecar in the data directory recording which story files were ingested
+INGESTED_STATE_FILE = ".ingested.json"
+
+# Citation text returned by /api/search is cut to this many characters
+CITATION_PREVIEW_CHARS = 500
+
+
+class SearchRequest(BaseModel):
+    """Body of the search endpoints; blank queries are rejected with a 422"""
+    query: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+
+
+class Citation(BaseModel):
+    """A story chunk cited by a search response"""
+    content: str
+    metadata: dict
+
+
+class SearchResponse(BaseModel):
+    """Body of /api/search"""
+    query: str
+    response: str
+    citations: List[Citation]
+
+
+# The UI page never changes at runtime, so it is read and encoded once
+STATIC_DIR = Path(__file__).parent / "static"
+INDEX_HTML = (STATIC_DIR / "index.html").read_bytes()
+INDEX_HTML_GZ = gzip.compress(INDEX_HTML, compresslevel=9)
+INDEX_HTML_ETAG = f'"{hashlib.sha256(INDEX_HTML).hexdigest()[:32]}"'
+# Each representation needs its own ETag, or a cache could answer a gzip
+# revalidation with the identity body
+INDEX_HTML_GZ_ETAG = INDEX_HTML_ETAG[:-1] + '-gzip"'
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an Accept-Encoding header allows a gzip response
+    
+    Args:
+        accept_encoding: Header value, e.g. "gzip, deflate;q=0.5"
+        
+    Returns:
+        True if gzip (or "*", when gzip isn't listed) has a non-zero q-value
+    """
+    qualities = {}
+    for entry in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in entry.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weakly, as RFC 9110 asks)"""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+
+@lru_cache()
+def _data_dir() -> Path:
+    """Directory holding the story files, created on first use"""
+    data_dir = Path(get_settings().data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
+def _file_key(file_path: Path) -> List[int]:
+    """Identify a file's version by its modification time and size"""
+    stat = file_path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+@lru_cache()
+def _ingested_state() -> dict:
+    """
+    Load the record of ingested story files
+    
+    The record is {'store': [chroma_db_path, collection_name], 'files':
+    {path: {'key': [mtime_ns, size], 'chunks': count}}}. It is discarded
+    when it was written for another vector store, or the store's directory
+    is gone, since the recorded chunks are then no longer searchable.
+    """
+    settings = get_settings()
+    store = [settings.chroma_db_path, settings.collection_name]
+    try:
+        state = json.loads((_data_dir() / INGESTED_STATE_FILE).read_text())
+    except (OSError, ValueError):
+        state = None
+    
+    if (
+        not isinstance(state, dict)
+        or state.get('store') != store
+        or not Path(settings.chroma_db_path).exists()
+    ):
+        state = {'store': store, 'files': {}}
+    return state
+
+
+def _is_ingested(file_path: Path) -> bool:
+    """Whether this version of the file was already ingested"""
+    recorded = _ingested_state()['files'].get(str(file_path))
+    return recorded is not None and recorded['key'] == _file_key(file_path)
+
+
+def _record_ingested(file_path: Path, chunks: int) -> None:
+    """Record a successful ingest of the file's current version"""
+    state = _ingested_state()
+    state['files'][str(file_path)] = {'key': _file_key(file_path), 'chunks': chunks}
+    
+    # Replace the sidecar in one step so a crash never leaves it half written
+    state_path = _data_dir() / INGESTED_STATE_FILE
+    temp_path = state_path.with_name(state_path.name + ".tmp")
+    temp_path.write_text(json.dumps(state))
+    os.replace(temp_path, state_path)
+
+
+def invalidate_search_responses() -> None:
+    """Drop cached search responses and answers once new stories have been ingested"""
+    response_cache = get_search_response_cache()
+    if response_cache is not None:
+        response_cache.clear()
+    llm_service = get_llm_repository()
+    if isinstance(llm_service, CachedLLMService):
+        llm_service.cache.clear()
 
 
 @app.on_event("startup")
 async def startup_event():
     """Preload all stories from the data directory on startup"""
-    settings = get_settings()
-    data_dir = Path(settings.data_dir)
+    data_dir = _data_dir()
+    
+    # Get all story files (PDF and TXT) in one directory pass; matching the
+    # suffix case-insensitively also avoids listing a file twice on
+    # case-insensitive filesystems
+    with os.scandir(data_dir) as entries:
+        story_files = [
+            Path(entry.path) for entry in entries
+            if entry.is_file() and entry.name.lower().endswith(STORY_FILE_SUFFIXES)
+        ]
     
-    if not data_dir.exists():
-        logger.warning(f"Data directory {data_dir} does not exist. Skipping story preload.")
+    if not story_files:
+        logger.info(f"No story files found in {data_dir}. Stories will need to be uploaded manually.")
         return
     
-    # Get all story files (PDF and TXT)
-    story_files = []
-    for ext in ['*.pdf', '*.txt']:
-        story_files.extend(data_dir.glob(ext))
-        story_files.extend(data_dir.glob(ext.upper()))
+    # Files ingested by an earlier run are already in the vector store
+    unchanged = [file_path for file_path in story_files if _is_ingested(file_path)]
+    for file_path in unchanged:
+        logger.info(f"Skipping {file_path.name}, already ingested")
+    story_files = [file_path for file_path in story_files if file_path not in unchanged]
     
     if not story_files:
-        logger.info(f"No story files found in {data_dir}. Stories will need to be uploaded manually.")
+        logger.info(f"Startup complete: All {len(unchanged)} story file(s) already ingested")
         return
     
     logger.info(f"Found {len(story_files)} story file(s) to preload...")
@@ -90,288 +268,63 @@ async def startup_event():
     # Initialize use case for ingestion
     ingest_use_case = get_ingest_use_case()
     
-    # Process each file
-    total_ingested = 0
-    for file_path in story_files:
-        try:
-            logger.info(f"Preloading stories from: {file_path.name}")
-            result = await ingest_use_case.execute(str(file_path))
-            total_ingested += result.get('stories_ingested', 0)
-            logger.info(f"✓ Successfully preloaded {result.get('stories_ingested', 0)} chunks from {file_path.name}")
-        except Exception as e:
-            logger.error(f"✗ Error preloading {file_path.name}: {str(e)}")
-            # Continue with other files even if one fails
+    # Preload files concurrently, a bounded number at a time
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_INGESTS)
+    
+    async def preload_one(file_path: Path):
+        async with semaphore:
+            try:
+                logger.info(f"Preloading stories from: {file_path.name}")
+                # A changed file replaces the chunks of its earlier version
+                result = await ingest_use_case.execute(str(file_path), replace=True)
+                _record_ingested(file_path, result.get('stories_ingested', 0))
+                logger.info(f"✓ Successfully preloaded {result.get('stories_ingested', 0)} chunks from {file_path.name}")
+                return result
+            except Exception as e:
+                logger.error(f"✗ Error preloading {file_path.name}: {str(e)}")
+                # Continue with other files even if one fails
+                return None
+    
+    results = await asyncio.gather(*(preload_one(file_path) for file_path in story_files))
+    total_ingested = sum(result.get('stories_ingested', 0) for result in results if result)
+    invalidate_search_responses()
     
     logger.info(f"Startup complete: Preloaded {total_ingested} total chunks from {len(story_files)} file(s)")
 
 
-# Dependency injection for use cases
-def get_ingest_use_case() -> IngestStoriesUseCase:
-    """Get ingest use case with dependencies"""
-    return IngestStoriesUseCase(
-        document_loader=get_document_loader_service(),
-        text_chunker=get_text_chunking_service(),
-        embedding_service=get_embedding_repository(),
-        vector_store=get_vector_store_repository()
-    )
-
-
-def get_search_use_case() -> SearchStoriesUseCase:
-    """Get search use case with dependencies"""
-    return SearchStoriesUseCase(
-        embedding_service=get_embedding_repository(),
-        vector_store=get_vector_store_repository()
-    )
+@app.on_event("startup")
+async def warm_vector_store():
+    """Load the vector index before the first search request"""
+    try:
+        await get_vector_store_repository().warm_up()
+        logger.info("Vector store warmed up")
+    except Exception as e:
+        logger.warning(f"Could not warm up vector store: {str(e)}")
 
 
-def get_generate_use_case() -> GenerateResponseUseCase:
-    """Get generate response use case with dependencies"""
-    return GenerateResponseUseCase(
-        search_use_case=get_search_use_case(),
-        llm_service=get_llm_repository()
-    )
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the shared OpenAI connection pools and the PDF worker processes"""
+    await close_openai_clients()
+    await asyncio.to_thread(get_document_loader_service().close)
 
 
 @app.get("/", response_class=HTMLResponse)
-async def root():
-    """Serve the main UI"""
-    return """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>JStory - Semantic Story Search</title>
-        <style>
-            * { margin: 0; padding: 0; box-sizing: border-box; }
-            body {
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                min-height: 100vh;
-                padding: 20px;
-            }
-            .container {
-                max-width: 1200px;
-                margin: 0 auto;
-                background: white;
-                border-radius: 20px;
-                box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-                overflow: hidden;
-            }
-            .header {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 40px;
-                text-align: center;
-            }
-            .header h1 { font-size: 2.5em; margin-bottom: 10px; }
-            .header p { font-size: 1.2em; opacity: 0.9; }
-            .content {
-                padding: 40px;
-            }
-            .section {
-                margin-bottom: 40px;
-            }
-            .section h2 {
-                color: #333;
-                margin-bottom: 20px;
-                font-size: 1.8em;
-                border-bottom: 3px solid #667eea;
-                padding-bottom: 10px;
-            }
-            .upload-area {
-                border: 3px dashed #667eea;
-                border-radius: 10px;
-                padding: 40px;
-                text-align: center;
-                background: #f8f9fa;
-                transition: all 0.3s;
-            }
-            .upload-area:hover {
-                background: #e9ecef;
-                border-color: #764ba2;
-            }
-            input[type="file"] {
-                margin: 20px 0;
-                padding: 10px;
-                border: 1px solid #ddd;
-                border-radius: 5px;
-                width: 100%;
-                max-width: 400px;
-            }
-            button {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                border: none;
-                padding: 15px 30px;
-                border-radius: 8px;
-                font-size: 1.1em;
-                cursor: pointer;
-                transition: transform 0.2s, box-shadow 0.2s;
-            }
-            button:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4);
-            }
-            button:disabled {
-                opacity: 0.6;
-                cursor: not-allowed;
-                transform: none;
-            }
-            .search-box {
-                display: flex;
-                gap: 10px;
-                margin-bottom: 20px;
-            }
-            .search-box input {
-                flex: 1;
-                padding: 15px;
-                border: 2px solid #ddd;
-                border-radius: 8px;
-                font-size: 1.1em;
-            }
-            .search-box input:focus {
-                outline: none;
-                border-color: #667eea;
-            }
-            .results {
-                margin-top: 30px;
-            }
-            .result-item {
-                background: #f8f9fa;
-                border-left: 4px solid #667eea;
-                padding: 20px;
-                margin-bottom: 20px;
-                border-radius: 5px;
-            }
-            .result-item h3 {
-                color: #667eea;
-                margin-bottom: 10px;
-            }
-            .result-item .score {
-                color: #666;
-                font-size: 0.9em;
-                margin-bottom: 10px;
-            }
-            .result-item .content {
-                color: #333;
-                line-height: 1.6;
-            }
-            .response {
-                background: #e7f3ff;
-                border-left: 4px solid #2196F3;
-                padding: 20px;
-                margin-top: 20px;
-                border-radius: 5px;
-            }
-            .response h3 {
-                color: #2196F3;
-                margin-bottom: 10px;
-            }
-            .loading {
-                text-align: center;
-                padding: 20px;
-                color: #666;
-            }
-            .error {
-                background: #ffebee;
-                border-left: 4px solid #f44336;
-                padding: 15px;
-                margin: 20px 0;
-                border-radius: 5px;
-                color: #c62828;
-            }
-            .success {
-                background: #e8f5e9;
-                border-left: 4px solid #4caf50;
-                padding: 15px;
-                margin: 20px 0;
-                border-radius: 5px;
-                color: #2e7d32;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>📚 JStory</h1>
-                <p>Semantic Story Search with RAG</p>
-            </div>
-            <div class="content">
-                <div class="section">
-                    <h2>📚 Preloaded Stories</h2>
-                    <div class="upload-area" style="background: #e8f5e9; border-color: #4caf50;">
-                        <p>Stories have been automatically preloaded from the data directory.<br><small>You can start searching immediately!</small></p>
-                    </div>
-                </div>
-                
-                <div class="section">
-                    <h2>🔍 Search Stories</h2>
-                    <div class="search-box">
-                        <input type="text" id="queryInput" placeholder="Enter your question about the stories..." onkeypress="handleKeyPress(event)">
-                        <button onclick="searchStories()">Search</button>
-                    </div>
-                    <div id="searchResults"></div>
-                </div>
-            </div>
-        </div>
-        
-        <script>
-            async function searchStories() {
-                const query = document.getElementById('queryInput').value.trim();
-                const resultsDiv = document.getElementById('searchResults');
-                
-                if (!query) {
-                    resultsDiv.innerHTML = '<div class="error">Please enter a search query</div>';
-                    return;
-                }
-                
-                resultsDiv.innerHTML = '<div class="loading">Searching stories and generating response...</div>';
-                
-                try {
-                    const response = await fetch('/api/search', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ query: query })
-                    });
-                    
-                    let result;
-                    const contentType = response.headers.get('content-type');
-                    if (contentType && contentType.includes('application/json')) {
-                        result = await response.json();
-                    } else {
-                        const text = await response.text();
-                        resultsDiv.innerHTML = `<div class="error">Error: Server returned non-JSON response: ${text.substring(0, 200)}</div>`;
-                        return;
-                    }
-                    
-                    if (response.ok) {
-                        let html = '';
-                        
-                        // Show generated response
-                        if (result.response) {
-                            html += '<div class="response">';
-                            html += '<h3>🤖 Generated Response</h3>';
-                            html += '<p>' + result.response.replace(/\\n/g, '<br>') + '</p>';
-                            html += '</div>';
-                        }
-                        
-                        resultsDiv.innerHTML = html;
-                    } else {
-                        resultsDiv.innerHTML = `<div class="error">Error: ${result.detail || 'Unknown error'}</div>`;
-                    }
-                } catch (error) {
-                    resultsDiv.innerHTML = `<div class="error">Error: ${error.message}</div>`;
-                }
-            }
-            
-            function handleKeyPress(event) {
-                if (event.key === 'Enter') {
-                    searchStories();
-                }
-            }
-        </script>
-    </body>
-    </html>
-    """
+async def root(request: Request):
+    """Serve the main UI, pre-compressed for clients that accept gzip"""
+    use_gzip = _accepts_gzip(request.headers.get("accept-encoding", ""))
+    etag = INDEX_HTML_GZ_ETAG if use_gzip else INDEX_HTML_ETAG
+    headers = {
+        "Cache-Control": "public, max-age=3600",
+        "Vary": "Accept-Encoding",
+        "ETag": etag
+    }
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return HTMLResponse(content=INDEX_HTML_GZ, headers=headers)
+    return HTMLResponse(content=INDEX_HTML, headers=headers)
 
 
 @app.post("/api/ingest")
@@ -379,9 +332,21 @@ async def ingest_stories(
     files: List[UploadFile] = File(...),
     use_case: IngestStoriesUseCase = Depends(get_ingest_use_case)
 ):
-    """Ingest PDF or TXT files into the vector database"""
-    results = []
+    """
+    Ingest PDF or TXT files into the vector database
+    
+    Files are processed concurrently. A file that fails to ingest is
+    reported as {'filename', 'error'} in the results instead of failing
+    the whole request.
+    
+    A file named like an earlier upload replaces that upload's chunks.
     
+    Files up to IN_MEMORY_UPLOAD_MAX_BYTES are parsed straight from memory
+    and written to the data directory only once ingested. Larger files are
+    streamed to disk and ingested from there, so memory use stays bounded.
+    If a file can't be saved or recorded after it was ingested, its chunks
+    are removed again and the file is reported as failed.
+    """
     for file in files:
         file_ext = file.filename.lower().split('.')[-1] if '.' in file.filename else ''
         if file_ext not in ['pdf', 'txt']:
@@ -389,61 +354,177 @@ async def ingest_stories(
                 status_code=400, 
                 detail=f"{file.filename} is not a supported file type. Supported: .pdf, .txt"
             )
-        
-        # Save file temporarily
-        file_path = DATA_DIR / file.filename
-        # For text files, we need to handle encoding properly
-        if file_ext == 'txt':
-            content = await file.read()
-            with open(file_path, "wb") as f:
-                f.write(content)
-        else:
-            with open(file_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
-        
-        try:
-            # Ingest the file
-            result = await use_case.execute(str(file_path))
-            results.append(result)
-        except Exception as e:
-            # Clean up file on error
-            if file_path.exists():
-                file_path.unlink()
-            raise HTTPException(status_code=500, detail=f"Error processing {file.filename}: {str(e)}")
     
-    return results
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_INGESTS)
+    
+    async def ingest_one(file: UploadFile) -> dict:
+        async with semaphore:
+            file_path = _data_dir() / file.filename
+            on_disk = False
+            ingested = False
+            try:
+                if file.size is not None and file.size <= IN_MEMORY_UPLOAD_MAX_BYTES:
+                    content = await file.read()
+                    await file.close()
+                    
+                    result = await use_case.execute(str(file_path), content, replace=True)
+                    ingested = True
+                    # Persist only what was ingested
+                    on_disk = True
+                    await asyncio.to_thread(file_path.write_bytes, content)
+                else:
+                    # Save file temporarily
+                    on_disk = True
+                    async with aiofiles.open(file_path, "wb") as f:
+                        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                            await f.write(chunk)
+                    # Release the upload's spooled buffer before the (slow) ingest
+                    await file.close()
+                    
+                    # Ingest the file
+                    result = await use_case.execute(str(file_path), replace=True)
+                    ingested = True
+                _record_ingested(file_path, result.get('stories_ingested', 0))
+                invalidate_search_responses()
+                return result
+            except Exception as e:
+                # Chunks of a file that isn't kept would never be replaced
+                if ingested:
+                    try:
+                        await use_case.vector_store.delete_by_source(str(file_path))
+                    except Exception as rollback_error:
+                        logger.error(f"✗ Error removing chunks of {file.filename}: {str(rollback_error)}")
+                    invalidate_search_responses()
+                # Clean up file on error
+                if on_disk and file_path.exists():
+                    file_path.unlink()
+                logger.error(f"✗ Error processing {file.filename}: {str(e)}")
+                return {'filename': file.filename, 'error': f"Error processing {file.filename}: {str(e)}"}
+    
+    return await asyncio.gather(*(ingest_one(file) for file in files))
 
 
-@app.post("/api/search")
+@app.post("/api/search", response_model=SearchResponse)
 async def search_stories(
-    query: dict,
-    use_case: GenerateResponseUseCase = Depends(get_generate_use_case)
+    body: SearchRequest,
+    use_case: GenerateResponseUseCase = Depends(get_generate_use_case),
+    embedding_service: EmbeddingRepository = Depends(get_embedding_repository),
+    response_cache: Optional[SemanticCache] = Depends(get_search_response_cache)
 ):
-    """Search stories and generate response"""
-    if not query.get('query'):
-        raise HTTPException(status_code=400, detail="Query is required")
+    """
+    Search stories and generate response
     
+    Answers to the same or a near-identical recent query are served from
+    the response cache without searching or generating again. The cache is
+    cleared whenever stories are ingested.
+    """
     try:
-        result = await use_case.execute(query['query'], top_k=3)
+        cached = None
+        if response_cache is not None:
+            query_embedding = await embedding_service.generate_embedding(body.query)
+            cached = response_cache.get(body.query, query_embedding)
         
-        return {
-            'query': result.query,
-            'response': result.response,
-            'citations': [
-                {
-                    'content': chunk.content,
-                    'metadata': chunk.metadata
-                }
-                for chunk in result.citations
-            ]
-        }
+        if cached is None:
+            result = await use_case.execute(body.query, top_k=3)
+            search_response = SearchResponse(
+                query=body.query,
+                response=result.response,
+                citations=[
+                    Citation(
+                        content=chunk.content[:CITATION_PREVIEW_CHARS],
+                        metadata=chunk.metadata
+                    )
+                    for chunk in result.citations
+                ]
+            )
+            if response_cache is not None:
+                response_cache.set(body.query, query_embedding, search_response)
+        else:
+            # A paraphrase may have been cached; answer with this query
+            search_response = cached.model_copy(update={'query': body.query})
+        
+        # Serialized in one pass by pydantic-core, skipping jsonable_encoder
+        return Response(search_response.model_dump_json(), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching stories: {str(e)}")
 
 
+async def search_events(
+    query: str,
+    use_case: GenerateResponseUseCase,
+    embedding_service: EmbeddingRepository,
+    response_cache: Optional[SemanticCache]
+):
+    """
+    Yield the Server-Sent Events of a streamed search response
+    
+    Each piece of the answer is sent as a `data: {"token": ...}` event,
+    followed by an `event: done`. Answers found in the search response cache
+    are sent whole as a single token. Failures after the stream has started
+    are sent as an `event: error` with a `detail` field.
+    """
+    try:
+        cached = None
+        if response_cache is not None:
+            query_embedding = await embedding_service.generate_embedding(query)
+            cached = response_cache.get(query, query_embedding)
+        
+        if cached is not None:
+            yield f"data: {json.dumps({'token': cached.response})}\n\n"
+        else:
+            async for token in use_case.execute_stream(query, top_k=3):
+                yield f"data: {json.dumps({'token': token})}\n\n"
+        yield "event: done\ndata: {}\n\n"
+    except Exception as e:
+        logger.error(f"✗ Error streaming search response: {str(e)}")
+        detail = f"Error searching stories: {str(e)}"
+        yield f"event: error\ndata: {json.dumps({'detail': detail})}\n\n"
+
+
+@app.post("/api/search/stream")
+async def search_stories_stream(
+    body: SearchRequest,
+    use_case: GenerateResponseUseCase = Depends(get_generate_use_case),
+    embedding_service: EmbeddingRepository = Depends(get_embedding_repository),
+    response_cache: Optional[SemanticCache] = Depends(get_search_response_cache)
+):
+    """Search stories and stream the generated response as Server-Sent Events"""
+    return StreamingResponse(
+        search_events(body.query, use_case, embedding_service, response_cache),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@app.get("/api/search/stream")
+async def search_stories_event_source(
+    query: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)],
+    use_case: GenerateResponseUseCase = Depends(get_generate_use_case),
+    embedding_service: EmbeddingRepository = Depends(get_embedding_repository),
+    response_cache: Optional[SemanticCache] = Depends(get_search_response_cache)
+):
+    """
+    Search stories and stream the generated response as Server-Sent Events
+    
+    GET variant for browser EventSource clients, which can't send a body:
+    /api/search/stream?query=...
+    """
+    return StreamingResponse(
+        search_events(query, use_case, embedding_service, response_cache),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "version": "0.1.0"}
+    health = {"status": "healthy", "version": "0.1.0"}
+    llm_service = get_llm_repository()
+    if isinstance(llm_service, CachedLLMService):
+        health["response_cache"] = llm_service.cache.stats()
+    response_cache = get_search_response_cache()
+    if response_cache is not None:
+        health["search_response_cache"] = response_cache.stats()
+    return health
 
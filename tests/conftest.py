@@ -0,0 +1,5 @@
+"""Shared test configuration"""
+import os
+
+# Settings are loaded at import time and require an API key; no test calls OpenAI
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
@@ -0,0 +1,352 @@
+"""Tests for the API"""
+import asyncio
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+import src.presentation.api as api
+from src.domain.models import GeneratedResponse, StoryChunk
+from src.domain.repositories import EmbeddingRepository
+from src.infrastructure.semantic_cache import SemanticCache
+
+
+class FakeIngestUseCase:
+    """Ingest use case recording which files it was asked to ingest"""
+    
+    def __init__(self):
+        self.calls = []
+        self.vector_store = SimpleNamespace(deleted=[])
+        
+        async def delete_by_source(source, keep_ids=None):
+            self.vector_store.deleted.append(os.path.basename(source))
+        
+        self.vector_store.delete_by_source = delete_by_source
+    
+    async def execute(self, file_path, content=None, replace=False):
+        self.calls.append((os.path.basename(file_path), replace))
+        if "bad" in file_path:
+            raise ValueError("unreadable")
+        return {'file_path': file_path, 'stories_ingested': 2}
+
+
+@pytest.fixture
+def preload(tmp_path, monkeypatch):
+    """Run startup preloads over a temporary data directory and vector store"""
+    data_dir = tmp_path / "data"
+    chroma_dir = tmp_path / "chroma"
+    data_dir.mkdir()
+    chroma_dir.mkdir()
+    settings = api.get_settings()
+    monkeypatch.setattr(settings, "data_dir", str(data_dir))
+    monkeypatch.setattr(settings, "chroma_db_path", str(chroma_dir))
+    monkeypatch.setattr(api, "invalidate_search_responses", lambda: None)
+    use_case = FakeIngestUseCase()
+    monkeypatch.setattr(api, "get_ingest_use_case", lambda: use_case)
+    
+    def run():
+        # Every run starts like a fresh process
+        api._data_dir.cache_clear()
+        api._ingested_state.cache_clear()
+        use_case.calls.clear()
+        asyncio.run(api.startup_event())
+        return sorted(use_case.calls)
+    
+    yield data_dir, chroma_dir, run
+    api._data_dir.cache_clear()
+    api._ingested_state.cache_clear()
+
+
+def test_unchanged_files_are_skipped(preload):
+    """Test that only new or changed files are ingested on later startups"""
+    data_dir, _, run = preload
+    (data_dir / "a.txt").write_text("first")
+    (data_dir / "b.txt").write_text("second")
+    (data_dir / "bad.txt").write_text("broken")
+    
+    assert run() == [("a.txt", True), ("b.txt", True), ("bad.txt", True)]
+    state = json.loads((data_dir / api.INGESTED_STATE_FILE).read_text())
+    assert sorted(os.path.basename(path) for path in state['files']) == ["a.txt", "b.txt"]
+    
+    # Failed files are retried; changed files replace their earlier chunks
+    assert run() == [("bad.txt", True)]
+    (data_dir / "b.txt").write_text("second, revised")
+    assert run() == [("b.txt", True), ("bad.txt", True)]
+
+
+def test_record_is_ignored_for_another_vector_store(preload, monkeypatch):
+    """Test that every file is ingested again when the vector store changes"""
+    data_dir, chroma_dir, run = preload
+    (data_dir / "a.txt").write_text("first")
+    run()
+    
+    monkeypatch.setattr(api.get_settings(), "collection_name", "other_chunks")
+    assert run() == [("a.txt", True)]
+    
+    chroma_dir.rmdir()
+    assert run() == [("a.txt", True)]
+
+
+def test_files_are_preloaded_concurrently(preload, monkeypatch):
+    """Test that startup ingests several files at once, up to MAX_CONCURRENT_INGESTS"""
+    data_dir, _, run = preload
+    for i in range(api.MAX_CONCURRENT_INGESTS + 4):
+        (data_dir / f"{i}.txt").write_text(f"story {i}")
+    running = 0
+    peak = 0
+    
+    async def slow_execute(file_path, content=None, replace=False):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {'file_path': file_path, 'stories_ingested': 1}
+    
+    use_case = api.get_ingest_use_case()
+    monkeypatch.setattr(use_case, "execute", slow_execute)
+    run()
+    
+    assert peak == api.MAX_CONCURRENT_INGESTS
+    state = json.loads((data_dir / api.INGESTED_STATE_FILE).read_text())
+    assert len(state['files']) == api.MAX_CONCURRENT_INGESTS + 4
+
+
+def test_corrupt_record_is_ignored(preload):
+    """Test that an unreadable record makes startup ingest every file"""
+    data_dir, _, run = preload
+    (data_dir / "a.txt").write_text("first")
+    (data_dir / api.INGESTED_STATE_FILE).write_text("{not json")
+    
+    assert run() == [("a.txt", True)]
+    assert json.loads((data_dir / api.INGESTED_STATE_FILE).read_text())['files']
+
+
+class FakeGenerateUseCase:
+    """Generate use case answering with a numbered response per call"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def execute(self, query, top_k=3):
+        self.calls += 1
+        chunk = StoryChunk(id="1", content="Once upon a time", metadata={'source': "book.txt"})
+        return GeneratedResponse(response=f"answer {self.calls}", citations=[chunk], query=query)
+    
+    async def execute_stream(self, query, top_k=3):
+        self.calls += 1
+        for token in ("answer ", str(self.calls)):
+            yield token
+
+
+class FakeEmbeddingService(EmbeddingRepository):
+    """Embedding service mapping every query about dragons to one vector"""
+    
+    async def generate_embedding(self, text):
+        return np.array([1.0, 0.0] if "dragon" in text else [0.0, 1.0], dtype=np.float32)
+    
+    async def generate_embeddings_batch(self, texts):
+        return [await self.generate_embedding(text) for text in texts]
+
+
+@pytest.fixture
+def search_client(monkeypatch):
+    """TestClient whose search endpoints use fakes and a fresh response cache"""
+    use_case = FakeGenerateUseCase()
+    cache = SemanticCache(threshold=0.97)
+    api.app.dependency_overrides = {
+        api.get_generate_use_case: lambda: use_case,
+        api.get_embedding_repository: FakeEmbeddingService,
+        api.get_search_response_cache: lambda: cache
+    }
+    # invalidate_search_responses looks the caches up directly
+    monkeypatch.setattr(api, "get_search_response_cache", lambda: cache)
+    monkeypatch.setattr(api, "get_llm_repository", lambda: None)
+    # Not used as a context manager, so the startup preload doesn't run
+    yield TestClient(api.app), use_case
+    api.app.dependency_overrides = {}
+
+
+def test_search_response_cache(search_client):
+    """Test that paraphrased searches are served from the cache until it is cleared"""
+    client, use_case = search_client
+    
+    first = client.post("/api/search", json={"query": "a dragon"}).json()
+    assert first['response'] == "answer 1"
+    
+    # A paraphrase is a hit, answered with its own query
+    paraphrase = client.post("/api/search", json={"query": "the dragon"}).json()
+    assert paraphrase == {**first, 'query': "the dragon"}
+    assert use_case.calls == 1
+    
+    # An unrelated query misses
+    assert client.post("/api/search", json={"query": "a knight"}).json()['response'] == "answer 2"
+    
+    api.invalidate_search_responses()
+    assert client.post("/api/search", json={"query": "a dragon"}).json()['response'] == "answer 3"
+
+
+def parse_events(body):
+    """Split a Server-Sent Events body into (event, data) pairs"""
+    events = []
+    for raw in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in raw.split("\n"))
+        events.append((fields.get("event", "message"), json.loads(fields["data"])))
+    return events
+
+
+def test_search_stream_sends_tokens_then_done(search_client, monkeypatch):
+    """Test the Server-Sent Events framing of a streamed answer"""
+    client, _ = search_client
+    monkeypatch.setitem(api.app.dependency_overrides, api.get_search_response_cache, lambda: None)
+    
+    response = client.post("/api/search/stream", json={"query": "a dragon"})
+    
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert parse_events(response.text) == [
+        ("message", {'token': "answer "}),
+        ("message", {'token': "1"}),
+        ("done", {})
+    ]
+
+
+def test_search_stream_reports_failures_as_error_events(search_client, monkeypatch):
+    """Test that a failure after the stream has started ends it with an error event"""
+    client, use_case = search_client
+    monkeypatch.setitem(api.app.dependency_overrides, api.get_search_response_cache, lambda: None)
+    
+    async def failing_stream(query, top_k=3):
+        yield "partial"
+        raise RuntimeError("model unavailable")
+    
+    use_case.execute_stream = failing_stream
+    events = parse_events(client.post("/api/search/stream", json={"query": "a dragon"}).text)
+    
+    assert events[0] == ("message", {'token': "partial"})
+    assert events[1][0] == "error"
+    assert "model unavailable" in events[1][1]['detail']
+
+
+def test_event_source_route_serves_cached_answers_whole(search_client):
+    """Test that the GET stream route sends a cached answer as one token"""
+    client, use_case = search_client
+    
+    cached = client.post("/api/search", json={"query": "a dragon"}).json()
+    events = parse_events(client.get("/api/search/stream", params={"query": "the dragon"}).text)
+    
+    assert events == [("message", {'token': cached['response']}), ("done", {})]
+    assert use_case.calls == 1
+
+
+@pytest.mark.parametrize("accept_encoding, use_gzip", [
+    ("gzip, deflate", True),
+    ("deflate, gzip;q=0.5", True),
+    ("gzip;q=0", False),
+    ("*", True),
+    ("*;q=0", False),
+    ("identity", False),
+    ("", False)
+])
+def test_accept_encoding_q_values(accept_encoding, use_gzip):
+    """Test that gzip is only chosen when its q-value is non-zero"""
+    assert api._accepts_gzip(accept_encoding) == use_gzip
+
+
+def test_index_revalidates_per_encoding():
+    """Test that each encoding of the page has its own ETag and round-trips to a 304"""
+    client = TestClient(api.app)
+    
+    for encoding, etag in (("gzip", api.INDEX_HTML_GZ_ETAG), ("identity", api.INDEX_HTML_ETAG)):
+        response = client.get("/", headers={"Accept-Encoding": encoding})
+        assert response.status_code == 200
+        assert response.headers["etag"] == etag
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers.get("content-encoding") == (encoding if encoding == "gzip" else None)
+        assert response.content == api.INDEX_HTML
+        
+        revalidated = client.get("/", headers={"Accept-Encoding": encoding, "If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == etag
+        assert revalidated.headers["vary"] == "Accept-Encoding"
+    
+    # A gzip ETag doesn't validate the identity body
+    stale = client.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": api.INDEX_HTML_GZ_ETAG})
+    assert stale.status_code == 200
+
+
+@pytest.fixture
+def ingest_client(tmp_path, monkeypatch):
+    """TestClient whose ingest endpoint uses a fake use case and a temporary data directory"""
+    monkeypatch.setattr(api.get_settings(), "data_dir", str(tmp_path / "data"))
+    monkeypatch.setattr(api.get_settings(), "chroma_db_path", str(tmp_path / "chroma"))
+    monkeypatch.setattr(api, "invalidate_search_responses", lambda: None)
+    api._data_dir.cache_clear()
+    api._ingested_state.cache_clear()
+    use_case = FakeIngestUseCase()
+    api.app.dependency_overrides = {api.get_ingest_use_case: lambda: use_case}
+    yield TestClient(api.app), use_case, tmp_path / "data"
+    api.app.dependency_overrides = {}
+    api._data_dir.cache_clear()
+    api._ingested_state.cache_clear()
+
+
+def test_upload_that_cannot_be_saved_is_rolled_back(ingest_client, monkeypatch):
+    """Test that an ingested upload whose file can't be written is reported and its chunks removed"""
+    client, use_case, data_dir = ingest_client
+    
+    def failing_write(path, content):
+        raise OSError("disk full")
+    
+    monkeypatch.setattr(Path, "write_bytes", failing_write)
+    results = client.post("/api/ingest", files=[("files", ("a.txt", b"Once upon a time"))]).json()
+    
+    assert "disk full" in results[0]['error']
+    assert use_case.vector_store.deleted == ["a.txt"]
+    assert not (data_dir / "a.txt").exists()
+    assert not (data_dir / api.INGESTED_STATE_FILE).exists()
+
+
+def test_upload_is_saved_before_the_response(ingest_client):
+    """Test that an in-memory upload is on disk and recorded once the request returns"""
+    client, use_case, data_dir = ingest_client
+    
+    results = client.post("/api/ingest", files=[("files", ("a.txt", b"Once upon a time"))]).json()
+    
+    assert results[0]['stories_ingested'] == 2
+    assert (data_dir / "a.txt").read_bytes() == b"Once upon a time"
+    state = json.loads((data_dir / api.INGESTED_STATE_FILE).read_text())
+    assert [os.path.basename(path) for path in state['files']] == ["a.txt"]
+    assert use_case.vector_store.deleted == []
+
+
+@pytest.mark.parametrize("query", ["", "   "])
+def test_blank_queries_are_rejected(search_client, query):
+    """Test that every search route answers a blank query with a 422 and a readable message"""
+    client, use_case = search_client
+    
+    responses = [
+        client.post("/api/search", json={"query": query}),
+        client.post("/api/search/stream", json={"query": query}),
+        client.get("/api/search/stream", params={"query": query})
+    ]
+    
+    for response in responses:
+        assert response.status_code == 422
+        assert response.json()['detail'][0]['msg']
+    assert use_case.calls == 0
+
+
+def test_failed_file_does_not_abort_the_upload(ingest_client):
+    """Test that a file that fails to ingest is reported while the others are ingested"""
+    client, use_case, data_dir = ingest_client
+    files = [("files", (name, b"Once upon a time")) for name in ("a.txt", "bad.txt", "b.txt")]
+    
+    results = client.post("/api/ingest", files=files).json()
+    
+    assert results[0]['stories_ingested'] == 2
+    assert results[1] == {'filename': "bad.txt", 'error': "Error processing bad.txt: unreadable"}
+    assert results[2]['stories_ingested'] == 2
+    assert sorted(use_case.calls) == [("a.txt", True), ("b.txt", True), ("bad.txt", True)]
+    assert sorted(path.name for path in data_dir.glob("*.txt")) == ["a.txt", "b.txt"]
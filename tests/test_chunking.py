@@ -1,6 +1,11 @@
 """Tests for text chunking service"""
+import asyncio
+from pathlib import Path
 import pytest
 from src.infrastructure.chunking import LangChainTextChunker
+from src.infrastructure.document_loader import PDFDocumentLoader
+
+STORIES_FILE = Path(__file__).parent.parent / "data" / "Stories.txt"
 
 
 def test_chunk_by_story_boundaries():
@@ -45,6 +50,26 @@ Third story content."""
     assert len(chunks) >= 2  # Should find at least 2 stories
 
 
+def test_chunk_by_headers_without_empty_lines():
+    """Test that story headers split text that has no empty lines"""
+    chunker = LangChainTextChunker()
+    
+    text = """Chapter 1
+The first story.
+Chapter 2
+The second story.
+Chapter 3
+The third story."""
+    
+    chunks = chunker.chunk_text(text)
+    
+    assert chunks == [
+        "Chapter 1\nThe first story.",
+        "Chapter 2\nThe second story.",
+        "Chapter 3\nThe third story."
+    ]
+
+
 def test_empty_text():
     """Test handling of empty text"""
     chunker = LangChainTextChunker()
@@ -88,3 +113,53 @@ Final story in the text."""
     assert "First story" not in chunks[1]  # Ensure no overlap
     assert "Second story" not in chunks[2]  # Ensure no overlap
 
+
+
+def test_long_text_chunked_with_overlap():
+    """Test that long text is split into overlapping word windows"""
+    chunker = LangChainTextChunker(max_words=10, overlap_words=3)
+    
+    text = " ".join(f"w{i}" for i in range(25))
+    chunks = chunker.chunk_text(text)
+    
+    assert chunks[0] == " ".join(f"w{i}" for i in range(10))
+    assert chunks[1].split()[:3] == ["w7", "w8", "w9"]
+    assert chunks[-1].split()[-1] == "w24"
+    assert all(len(chunk.split()) <= 10 for chunk in chunks)
+
+
+def test_overlap_must_be_smaller_than_chunk():
+    """Test that an overlap that would stall the chunk window is rejected"""
+    with pytest.raises(ValueError):
+        LangChainTextChunker(max_words=10, overlap_words=10)
+
+
+async def _chunk_stream(chunker, texts):
+    async def pieces():
+        for text in texts:
+            yield text
+    return [chunk async for chunk in chunker.chunk_stream(pieces())]
+
+
+def test_chunk_stream_matches_chunk_text():
+    """Test that chunking a stream of paragraphs splits headers like the whole text"""
+    chunker = LangChainTextChunker()
+    
+    several = ["A shopping list:\n1. eggs\n2. milk", "Story 2: The End"]
+    assert asyncio.run(_chunk_stream(chunker, several)) == chunker.chunk_text("\n\n".join(several))
+    
+    single = ["Story 1: A\nStory 2: B"]
+    assert asyncio.run(_chunk_stream(chunker, single)) == ["Story 1: A", "Story 2: B"]
+
+
+@pytest.mark.skipif(not STORIES_FILE.exists(), reason="bundled stories not present")
+def test_streamed_stories_file_chunks_like_whole_text():
+    """Test that the streamed ingest path chunks the bundled stories like chunk_text"""
+    chunker = LangChainTextChunker()
+    loader = PDFDocumentLoader()
+    
+    async def stream_chunks():
+        return [chunk async for chunk in chunker.chunk_stream(loader.stream_text(str(STORIES_FILE)))]
+    
+    whole_text = STORIES_FILE.read_text(encoding='utf-8', errors='replace')
+    assert asyncio.run(stream_chunks()) == chunker.chunk_text(whole_text)
@@ -0,0 +1,37 @@
+"""Tests for the dependency injection container"""
+from src.config import dependencies
+
+
+def test_factories_return_singletons(tmp_path, monkeypatch):
+    """Test that every factory builds its instance once and shares it"""
+    settings = dependencies.get_settings()
+    monkeypatch.setattr(settings, "embedding_cache_path", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(settings, "chroma_db_path", str(tmp_path / "chroma"))
+    factories = [
+        dependencies.get_settings,
+        dependencies.get_rate_limiter,
+        dependencies.get_vector_store_repository,
+        dependencies.get_embedding_repository,
+        dependencies.get_llm_repository,
+        dependencies.get_search_response_cache,
+        dependencies.get_document_loader_service,
+        dependencies.get_text_chunking_service,
+        dependencies.get_ingest_use_case,
+        dependencies.get_search_use_case,
+        dependencies.get_generate_use_case,
+    ]
+    for factory in factories:
+        factory.cache_clear()
+    
+    try:
+        for factory in factories:
+            assert factory() is factory()
+        
+        # The LLM response cache embeds queries with the shared embedding service
+        assert dependencies.get_llm_repository().embedding_service is dependencies.get_embedding_repository()
+        # Use cases are built from the shared services
+        assert dependencies.get_ingest_use_case().vector_store is dependencies.get_vector_store_repository()
+        assert dependencies.get_generate_use_case().search_use_case is dependencies.get_search_use_case()
+    finally:
+        for factory in factories:
+            factory.cache_clear()
@@ -0,0 +1,56 @@
+"""Tests for the document loader"""
+import asyncio
+import io
+import threading
+import time
+import pytest
+from pypdf import PdfWriter
+from src.infrastructure.document_loader import PDFDocumentLoader, _iter_in_thread
+
+
+def test_pdf_workers_are_spawned_and_shut_down(tmp_path):
+    """Test that PDFs are parsed in spawned processes that close() shuts down"""
+    writer = PdfWriter()
+    writer.add_blank_page(100, 100)
+    pdf = io.BytesIO()
+    writer.write(pdf)
+    (tmp_path / "blank.pdf").write_bytes(pdf.getvalue())
+    
+    loader = PDFDocumentLoader(pdf_backend="pypdf", max_workers=1)
+    document = asyncio.run(loader.load_pdf(str(tmp_path / "blank.pdf")))
+    assert document.title == "blank"
+    assert loader.pool._mp_context.get_start_method() == "spawn"
+    
+    loader.close()
+    assert loader._pool is None
+
+
+def test_paragraphs_are_closed_after_a_cancelled_scan():
+    """Test that cancelling a stream mid-scan closes the iterator once its worker is done"""
+    scanning = threading.Event()
+    closed = threading.Event()
+    
+    def paragraphs():
+        try:
+            yield "first"
+            scanning.set()
+            time.sleep(0.2)
+            yield "second"
+        finally:
+            closed.set()
+    
+    async def consume():
+        async for _ in _iter_in_thread(paragraphs()):
+            pass
+    
+    async def run():
+        task = asyncio.create_task(consume())
+        await asyncio.to_thread(scanning.wait)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return closed.is_set()
+    
+    # Still scanning when the consumer is cancelled, so not closed under it
+    assert asyncio.run(run()) is False
+    assert closed.wait(1)
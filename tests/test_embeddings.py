@@ -0,0 +1,198 @@
+"""Tests for embedding services"""
+import asyncio
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from src.domain.repositories import EmbeddingRepository
+from src.infrastructure.embeddings import (
+    CachedEmbeddingService,
+    MicroBatchingEmbeddingService,
+    OpenAIEmbeddingService,
+    QueryEmbeddingLRU
+)
+
+
+class FakeEmbeddingService(EmbeddingRepository):
+    """Embedding service that records which texts it was asked to embed"""
+    
+    model_name = "fake-model"
+    
+    def __init__(self):
+        self.calls = []
+    
+    async def generate_embedding(self, text):
+        self.calls.append([text])
+        return [float(len(text)), 1.0]
+    
+    async def generate_embeddings_batch(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_cached_embeddings_only_forward_misses(tmp_path):
+    """Test that cached texts are not sent to the underlying service again"""
+    inner = FakeEmbeddingService()
+    service = CachedEmbeddingService(inner, db_path=str(tmp_path / "cache.db"))
+    
+    first = asyncio.run(service.generate_embeddings_batch(["one", "three", "one"]))
+    second = asyncio.run(service.generate_embeddings_batch(["three", "seven", ""]))
+    
+    assert [v.tolist() for v in first] == [[3.0, 1.0], [5.0, 1.0], [3.0, 1.0]]
+    assert [v.tolist() for v in second] == [[5.0, 1.0], [5.0, 1.0], []]
+    assert all(v.dtype == np.float32 for v in first + second)
+    assert inner.calls == [["one", "three"], ["seven"]]
+
+
+def test_cached_embeddings_persist_across_instances(tmp_path):
+    """Test that the cache survives a new service instance"""
+    db_path = str(tmp_path / "cache.db")
+    asyncio.run(CachedEmbeddingService(FakeEmbeddingService(), db_path).generate_embedding("story"))
+    
+    inner = FakeEmbeddingService()
+    embedding = asyncio.run(CachedEmbeddingService(inner, db_path).generate_embedding("story"))
+    
+    assert embedding.tolist() == [5.0, 1.0]
+    assert inner.calls == []
+
+
+def test_cached_embeddings_reject_empty_text(tmp_path):
+    """Test that empty text is rejected like the underlying service"""
+    service = CachedEmbeddingService(FakeEmbeddingService(), str(tmp_path / "cache.db"))
+    
+    with pytest.raises(ValueError):
+        asyncio.run(service.generate_embedding("   "))
+
+
+def test_near_duplicate_chunks_reuse_embeddings(tmp_path):
+    """Test that a minor edit reuses the original chunk's embedding"""
+    inner = FakeEmbeddingService()
+    service = CachedEmbeddingService(
+        inner, str(tmp_path / "cache.db"), semantic_threshold=0.9
+    )
+    original = " ".join(f"word{i}" for i in range(200))
+    edited = original + " extra"
+    
+    first = asyncio.run(service.generate_embeddings_batch([original]))
+    second = asyncio.run(service.generate_embeddings_batch([edited, "unrelated text"]))
+    
+    assert second[0].tolist() == first[0].tolist()
+    assert inner.calls == [[original], ["unrelated text"]]
+
+
+def test_int8_cache_round_trips_close_to_original(tmp_path):
+    """Test that int8-quantized cache entries decode close to the original"""
+    class RandomEmbeddingService(FakeEmbeddingService):
+        async def generate_embeddings_batch(self, texts):
+            self.calls.append(list(texts))
+            rng = np.random.default_rng(0)
+            return [rng.standard_normal(64).astype(np.float32) for _ in texts]
+    
+    db_path = str(tmp_path / "cache.db")
+    inner = RandomEmbeddingService()
+    original = asyncio.run(
+        CachedEmbeddingService(inner, db_path, storage_dtype="int8").generate_embeddings_batch(["story"])
+    )[0]
+    
+    cached = asyncio.run(
+        CachedEmbeddingService(inner, db_path, storage_dtype="int8").generate_embeddings_batch(["story"])
+    )[0]
+    
+    assert len(inner.calls) == 1
+    assert cached.dtype == np.float32
+    assert np.abs(cached - original).max() <= np.abs(original).max() / 127
+
+
+def test_micro_batching_coalesces_concurrent_requests():
+    """Test that concurrent single-text requests are sent as one batch"""
+    inner = FakeEmbeddingService()
+    service = MicroBatchingEmbeddingService(inner, max_batch_size=3, max_wait_ms=5)
+    
+    async def run():
+        return await asyncio.gather(*(
+            service.generate_embedding(text) for text in ["a", "bb", "ccc", "dddd"]
+        ))
+    
+    embeddings = asyncio.run(run())
+    assert [embedding[0] for embedding in embeddings] == [1.0, 2.0, 3.0, 4.0]
+    assert inner.calls == [["a", "bb", "ccc"], ["dddd"]]
+
+
+def test_micro_batching_propagates_errors():
+    """Test that a failed batch fails every request in it"""
+    class FailingEmbeddingService(FakeEmbeddingService):
+        async def generate_embeddings_batch(self, texts):
+            raise RuntimeError("embedding backend down")
+    
+    service = MicroBatchingEmbeddingService(FailingEmbeddingService(), max_wait_ms=1)
+    
+    async def run():
+        return await asyncio.gather(
+            service.generate_embedding("a"),
+            service.generate_embedding("b"),
+            return_exceptions=True
+        )
+    
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_query_lru_reuses_recent_queries_only():
+    """Test that repeated queries are served from memory and batches pass through"""
+    inner = FakeEmbeddingService()
+    service = QueryEmbeddingLRU(inner, max_entries=2)
+    
+    for text in ["dragons", "dragons", "knights", "castles", "dragons"]:
+        asyncio.run(service.generate_embedding(text))
+    asyncio.run(service.generate_embeddings_batch(["dragons"]))
+    
+    assert inner.calls == [["dragons"], ["knights"], ["castles"], ["dragons"], ["dragons"]]
+
+
+class FakeEmbeddingsClient:
+    """AsyncOpenAI stand-in embedding each text as [number in its name, 1]"""
+    
+    def __init__(self):
+        self.embeddings = self
+        self.requests = []
+    
+    async def create(self, model, input):
+        self.requests.append(list(input))
+        data = [
+            SimpleNamespace(index=i, embedding=[float(text.split()[-1]), 1.0])
+            for i, text in enumerate(input)
+        ]
+        # The API doesn't promise order; stitching must go by index
+        return SimpleNamespace(data=data[::-1])
+
+
+def make_openai_service(**limits):
+    service = OpenAIEmbeddingService(api_key="test-key", **limits)
+    service.client = FakeEmbeddingsClient()
+    return service
+
+
+def test_batches_are_split_by_item_limit():
+    """Test that more texts than max_batch_size are sent as several requests, in order"""
+    service = make_openai_service(max_batch_size=3)
+    texts = [f"text {i}" for i in range(8)]
+    
+    vectors = asyncio.run(service.generate_embeddings_batch(texts))
+    
+    assert [len(request) for request in service.client.requests] == [3, 3, 2]
+    assert [vector[0] for vector in vectors] == list(range(8))
+
+
+def test_batches_are_split_by_token_limit():
+    """Test that the token budget closes a batch before the item limit does"""
+    service = make_openai_service(max_batch_tokens=30)
+    texts = [f"{'word ' * 20}{i}" for i in range(5)]
+    tokens = service._estimate_tokens(texts[0])
+    
+    batches = service._pack_batches(texts)
+    vectors = asyncio.run(service.generate_embeddings_batch(["", *texts]))
+    
+    assert tokens * 2 > 30 >= tokens
+    assert batches == [(i, [text]) for i, text in enumerate(texts)]
+    assert len(service.client.requests) == 5
+    assert len(vectors[0]) == 0
+    assert [vector[0] for vector in vectors[1:]] == list(range(5))
@@ -0,0 +1,150 @@
+"""Tests for LLM services"""
+import asyncio
+import json
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from src.domain.models import StoryChunk
+from src.domain.repositories import EmbeddingRepository, LLMRepository
+from src.infrastructure.llm import CachedLLMService, NO_STORIES_RESPONSE, OpenAILLMService
+from src.infrastructure.rate_limiter import RateLimiter
+
+
+class FakeLLMService(LLMRepository):
+    """LLM service that answers with the IDs of its context chunks"""
+    
+    model_name = "fake-model"
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def generate_response(self, query, context_chunks):
+        self.calls += 1
+        return f"{query}: " + ",".join(chunk.id for chunk in context_chunks)
+
+
+class FakeEmbeddingService(EmbeddingRepository):
+    """Embedding service mapping every query about dragons to one vector"""
+    
+    async def generate_embedding(self, text):
+        return np.array([1.0, 0.0] if "dragon" in text else [0.0, 1.0], dtype=np.float32)
+    
+    async def generate_embeddings_batch(self, texts):
+        return [await self.generate_embedding(text) for text in texts]
+
+
+def make_chunks(*ids):
+    return [StoryChunk(id=chunk_id, content=f"story {chunk_id}", metadata={}) for chunk_id in ids]
+
+
+def test_cached_answers_depend_on_context():
+    """Test that an answer is only reused for the same context chunks"""
+    inner = FakeLLMService()
+    service = CachedLLMService(inner, FakeEmbeddingService())
+    
+    first = asyncio.run(service.generate_response("a dragon", make_chunks("1", "2")))
+    again = asyncio.run(service.generate_response("a dragon", make_chunks("1", "2")))
+    assert again == first
+    assert inner.calls == 1
+    
+    changed = asyncio.run(service.generate_response("a dragon", make_chunks("1", "3")))
+    assert changed == "a dragon: 1,3"
+    assert inner.calls == 2
+
+
+def test_similar_queries_need_the_same_context():
+    """Test that a semantic hit is only served from the same context chunks"""
+    inner = FakeLLMService()
+    service = CachedLLMService(inner, FakeEmbeddingService())
+    
+    asyncio.run(service.generate_response("a dragon", make_chunks("1")))
+    asyncio.run(service.generate_response("one dragon", make_chunks("2")))
+    assert inner.calls == 2
+    
+    # Both earlier answers are similar; the one with matching context wins
+    assert asyncio.run(service.generate_response("the dragon", make_chunks("2"))) == "one dragon: 2"
+    assert asyncio.run(service.generate_response("the dragon", make_chunks("1"))) == "a dragon: 1"
+    assert inner.calls == 2
+
+
+def test_streamed_answers_are_cached():
+    """Test that a streamed answer is cached whole and served to later streams"""
+    inner = FakeLLMService()
+    service = CachedLLMService(inner, FakeEmbeddingService())
+    
+    async def stream(query, chunks):
+        return [piece async for piece in service.generate_response_stream(query, chunks)]
+    
+    assert asyncio.run(stream("a dragon", make_chunks("1"))) == ["a dragon: 1"]
+    assert asyncio.run(stream("a dragon", make_chunks("1"))) == ["a dragon: 1"]
+    assert asyncio.run(service.generate_response("a dragon", make_chunks("1"))) == "a dragon: 1"
+    assert inner.calls == 1
+
+
+class FakeBatchClient:
+    """AsyncOpenAI stand-in serving a completed batch's output and error files"""
+    
+    def __init__(self, output_lines, error_lines):
+        self.files = self
+        self.batches = self
+        self._contents = {
+            "output-file": "\n".join(json.dumps(line) for line in output_lines),
+            "error-file": "\n".join(json.dumps(line) for line in error_lines)
+        }
+    
+    async def create(self, **kwargs):
+        if "purpose" in kwargs:
+            return SimpleNamespace(id="input-file")
+        return SimpleNamespace(
+            id="batch", status="completed",
+            output_file_id="output-file" if self._contents["output-file"] else None,
+            error_file_id="error-file" if self._contents["error-file"] else None
+        )
+    
+    async def content(self, file_id):
+        return SimpleNamespace(text=self._contents[file_id])
+
+
+def batch_output(custom_id, content):
+    return {
+        "custom_id": custom_id,
+        "response": {"status_code": 200, "body": {"choices": [{"message": {"content": content}}]}}
+    }
+
+
+def test_batch_responses_keep_job_order():
+    """Test that batch answers are matched to their jobs by custom_id"""
+    service = OpenAILLMService(api_key="test-key")
+    service.client = FakeBatchClient([batch_output("2", "second"), batch_output("0", "first")], [])
+    jobs = [("a", make_chunks("1")), ("b", []), ("c", make_chunks("2"))]
+    
+    assert asyncio.run(service.generate_responses_batch(jobs)) == ["first", NO_STORIES_RESPONSE, "second"]
+
+
+def test_batch_raises_on_failed_requests():
+    """Test that requests in the error file fail the batch instead of looking answered"""
+    failed = {
+        "custom_id": "1",
+        "response": {"status_code": 400, "body": {"error": {"message": "context too long"}}}
+    }
+    service = OpenAILLMService(api_key="test-key")
+    service.client = FakeBatchClient([batch_output("0", "first")], [failed])
+    jobs = [("a", make_chunks("1")), ("b", make_chunks("2"))]
+    
+    with pytest.raises(ValueError, match="context too long"):
+        asyncio.run(service.generate_responses_batch(jobs))
+    
+    service.client = FakeBatchClient([batch_output("0", "first")], [])
+    with pytest.raises(ValueError, match="no result"):
+        asyncio.run(service.generate_responses_batch(jobs))
+
+
+def test_rate_limited_service_leaves_retries_to_the_limiter():
+    """Test that the SDK doesn't retry underneath the rate limiter"""
+    limited = OpenAILLMService(api_key="test-key", rate_limiter=RateLimiter())
+    unlimited = OpenAILLMService(api_key="test-key")
+    
+    assert limited.client.max_retries == 0
+    assert unlimited.client.max_retries > 0
+    # Both still share one connection pool
+    assert limited.client._client is unlimited.client._client
@@ -0,0 +1,114 @@
+"""Tests for the ONNX embedding service"""
+import asyncio
+import threading
+import time
+import numpy as np
+import pytest
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+
+from onnx import helper, numpy_helper, TensorProto
+from tokenizers import Tokenizer, models, pre_tokenizers
+from tokenizers.processors import TemplateProcessing
+from src.infrastructure.onnx_embeddings import ONNXEmbeddingService
+
+
+@pytest.fixture
+def model_files(tmp_path):
+    """Build a tiny model whose token states are rows of a lookup table"""
+    vocab = {"[PAD]": 0, "[UNK]": 1, "[CLS]": 2, "once": 3, "upon": 4, "a": 5, "time": 6, "dragon": 7}
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = TemplateProcessing(single="[CLS] $A", special_tokens=[("[CLS]", 2)])
+    tokenizer.save(str(tmp_path / "tokenizer.json"))
+    
+    table = np.random.default_rng(0).standard_normal((len(vocab), 4)).astype(np.float32)
+    inputs = [
+        helper.make_tensor_value_info(name, TensorProto.INT64, ["batch", "tokens"])
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+    ]
+    output = helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["batch", "tokens", 4])
+    graph = helper.make_graph(
+        [helper.make_node("Gather", ["table", "input_ids"], ["last_hidden_state"])],
+        "lookup", inputs, [output], [numpy_helper.from_array(table, "table")]
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    onnx.save(model, str(tmp_path / "model.onnx"))
+    return str(tmp_path / "model.onnx"), str(tmp_path / "tokenizer.json"), table
+
+
+def test_cls_and_mean_pooling(model_files):
+    """Test pooled embeddings are normalized and unaffected by batch padding"""
+    model_path, tokenizer_path, table = model_files
+    
+    service = ONNXEmbeddingService(model_path, tokenizer_path, pooling="cls")
+    embedding = asyncio.run(service.generate_embedding("once upon a time"))
+    assert np.allclose(embedding, table[2] / np.linalg.norm(table[2]))
+    
+    service = ONNXEmbeddingService(model_path, tokenizer_path, pooling="mean")
+    single = asyncio.run(service.generate_embedding("once upon a time"))
+    batch = asyncio.run(service.generate_embeddings_batch(["dragon", "", "once upon a time"]))
+    assert np.isclose(np.linalg.norm(single), 1.0)
+    assert np.allclose(batch[2], single, atol=1e-6)
+    assert len(batch[1]) == 0
+
+
+def test_batches_are_split_and_keep_input_order(model_files):
+    """Test that length-sorted sub-batches come back in input order"""
+    model_path, tokenizer_path, _ = model_files
+    service = ONNXEmbeddingService(model_path, tokenizer_path, pooling="mean", batch_size=2)
+    texts = ["once upon a time", "dragon", "a dragon", "time", "upon a time"]
+    
+    batch = asyncio.run(service.generate_embeddings_batch(texts))
+    for text, embedding in zip(texts, batch):
+        assert np.allclose(embedding, asyncio.run(service.generate_embedding(text)), atol=1e-6)
+
+
+def test_cache_key_depends_on_model_contents(model_files, tmp_path):
+    """Test that identically named models get different embedding cache keys"""
+    model_path, tokenizer_path, _ = model_files
+    other_dir = tmp_path / "other"
+    other_dir.mkdir()
+    model = onnx.load(model_path)
+    model.graph.initializer[0].CopyFrom(
+        numpy_helper.from_array(np.ones((8, 4), dtype=np.float32), "table")
+    )
+    onnx.save(model, str(other_dir / "model.onnx"))
+    
+    first = ONNXEmbeddingService(model_path, tokenizer_path)
+    second = ONNXEmbeddingService(str(other_dir / "model.onnx"), tokenizer_path)
+    named = ONNXEmbeddingService(model_path, tokenizer_path, model_id="bge-small-en-v1.5-int8")
+    
+    assert first.model_name != second.model_name
+    assert first.model_name == ONNXEmbeddingService(model_path, tokenizer_path).model_name
+    assert first.model_name != ONNXEmbeddingService(model_path, tokenizer_path, pooling="mean").model_name
+    assert named.model_name.startswith("onnx:bge-small-en-v1.5-int8:")
+
+
+def test_concurrent_batches_are_bounded_by_sessions(model_files):
+    """Test that no more batches run at once than there are sessions"""
+    model_path, tokenizer_path, _ = model_files
+    service = ONNXEmbeddingService(model_path, tokenizer_path, batch_size=1, num_sessions=2)
+    embed = service._embed
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+    
+    def tracked_embed(texts):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        try:
+            time.sleep(0.01)
+            return embed(texts)
+        finally:
+            with lock:
+                running -= 1
+    
+    service._embed = tracked_embed
+    asyncio.run(service.generate_embeddings_batch(["dragon"] * 8))
+    assert peak == 2
@@ -0,0 +1,65 @@
+"""Tests for the OpenAI rate limiter"""
+import asyncio
+import time
+import httpx
+import pytest
+from openai import InternalServerError, RateLimitError
+from src.infrastructure.rate_limiter import RateLimiter
+
+
+def _rate_limit_error() -> RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    response = httpx.Response(429, request=request)
+    return RateLimitError("Rate limit reached", response=response, body=None)
+
+
+def test_requests_are_paced_to_the_token_budget():
+    """Test that requests wait for the token bucket to refill"""
+    limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=600)
+    
+    async def run():
+        start = time.monotonic()
+        await limiter.acquire(tokens=600)
+        await limiter.acquire(tokens=20)
+        return time.monotonic() - start
+    
+    # 600 tokens/minute refill at 10 tokens/second, so 20 tokens take ~2s
+    assert asyncio.run(run()) >= 1.9
+
+
+def test_rate_limit_errors_are_retried():
+    """Test retries after 429s and giving up after max_retries"""
+    limiter = RateLimiter(max_retries=2, base_delay=0.001)
+    calls = []
+    
+    async def flaky(value):
+        calls.append(value)
+        if len(calls) < 3:
+            raise _rate_limit_error()
+        return value
+    
+    assert asyncio.run(limiter.call(flaky, "ok")) == "ok"
+    assert len(calls) == 3
+    
+    async def always_limited():
+        raise _rate_limit_error()
+    
+    with pytest.raises(RateLimitError):
+        asyncio.run(limiter.call(always_limited))
+
+
+def test_server_errors_are_retried():
+    """Test that 5xx responses are retried like rate limit errors"""
+    limiter = RateLimiter(max_retries=1, base_delay=0.001)
+    calls = []
+    
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+            response = httpx.Response(500, request=request)
+            raise InternalServerError("Server error", response=response, body=None)
+        return "ok"
+    
+    assert asyncio.run(limiter.call(flaky)) == "ok"
+    assert len(calls) == 2
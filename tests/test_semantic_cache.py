@@ -0,0 +1,29 @@
+"""Tests for the semantic cache"""
+import numpy as np
+from src.infrastructure.semantic_cache import SemanticCache
+
+
+def test_exact_and_semantic_hits():
+    """Test lookups by exact key and by similar embedding"""
+    cache = SemanticCache(threshold=0.9)
+    cache.set("dragons", np.array([1.0, 0.0, 0.0]), "answer")
+    
+    assert cache.get("dragons") == "answer"
+    assert cache.get("tell me about dragons", np.array([0.95, 0.1, 0.0])) == "answer"
+    assert cache.get("princesses", np.array([0.0, 1.0, 0.0])) is None
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'size': 1}
+
+
+def test_entries_expire_and_are_evicted():
+    """Test TTL expiry and LRU eviction"""
+    cache = SemanticCache(ttl_seconds=-1)
+    cache.set("a", np.ones(2), "first")
+    assert cache.get("a") is None
+    
+    cache = SemanticCache(max_entries=2)
+    cache.set("a", np.array([1.0, 0.0]), 1)
+    cache.set("b", np.array([0.0, 1.0]), 2)
+    cache.get("a")
+    cache.set("c", np.array([-1.0, 0.0]), 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
@@ -0,0 +1,190 @@
+"""Tests for application use cases"""
+import asyncio
+import numpy as np
+import pytest
+from src.application.use_cases import IngestStoriesUseCase
+from src.domain.repositories import EmbeddingRepository, VectorStoreRepository
+from src.domain.services import DocumentLoaderService
+from src.infrastructure.chunking import LangChainTextChunker
+from src.infrastructure.document_loader import PDFDocumentLoader
+
+
+class FakeDocumentLoader(DocumentLoaderService):
+    """Loader that streams a fixed list of text pieces"""
+    
+    def __init__(self, pieces):
+        self.pieces = pieces
+    
+    async def load_pdf(self, file_path):
+        raise NotImplementedError
+    
+    async def stream_text(self, file_path):
+        for piece in self.pieces:
+            yield piece
+
+
+class FakeEmbeddingService(EmbeddingRepository):
+    """Embedding service returning one-dimensional vectors"""
+    
+    async def generate_embedding(self, text):
+        return np.ones(1, dtype=np.float32)
+    
+    async def generate_embeddings_batch(self, texts):
+        return [np.ones(1, dtype=np.float32) for _ in texts]
+
+
+class FakeVectorStore(VectorStoreRepository):
+    """Vector store recording every add_chunks batch"""
+    
+    def __init__(self):
+        self.batches = []
+    
+    async def add_chunks(self, chunks):
+        self.batches.append(chunks)
+    
+    async def search_similar(self, query_embedding, top_k=3):
+        return []
+    
+    async def get_chunk_by_id(self, chunk_id):
+        return None
+    
+    async def delete_by_source(self, source, keep_ids=None):
+        keep = set(keep_ids or ())
+        self.batches = [
+            [chunk for chunk in batch if chunk.metadata['source'] != source or chunk.id in keep]
+            for batch in self.batches
+        ]
+    
+    async def delete_chunks(self, chunk_ids):
+        self.batches = [
+            [chunk for chunk in batch if chunk.id not in chunk_ids]
+            for batch in self.batches
+        ]
+    
+    async def clear_all(self):
+        self.batches = []
+
+
+def make_use_case(pieces, batch_size=256):
+    vector_store = FakeVectorStore()
+    use_case = IngestStoriesUseCase(
+        document_loader=FakeDocumentLoader(pieces),
+        text_chunker=LangChainTextChunker(),
+        embedding_service=FakeEmbeddingService(),
+        vector_store=vector_store,
+        batch_size=batch_size
+    )
+    return use_case, vector_store
+
+
+def test_ingest_stores_chunks_in_batches():
+    """Test that ingestion stores chunks in batches with document-wide indexes"""
+    use_case, vector_store = make_use_case([f"Story {i}" for i in range(5)], batch_size=2)
+    
+    result = asyncio.run(use_case.execute("data/book.txt"))
+    
+    assert result['stories_ingested'] == 5
+    assert result['title'] == "book"
+    assert [len(batch) for batch in vector_store.batches] == [2, 2, 1]
+    chunks = [chunk for batch in vector_store.batches for chunk in batch]
+    assert [chunk.metadata['chunk_index'] for chunk in chunks] == [0, 1, 2, 3, 4]
+    assert len({chunk.id for chunk in chunks}) == 5
+
+
+def test_ingest_rejects_empty_document():
+    """Test that a document without text is rejected"""
+    use_case, vector_store = make_use_case(["", "   "])
+    
+    with pytest.raises(ValueError):
+        asyncio.run(use_case.execute("data/empty.txt"))
+    assert vector_store.batches == []
+
+
+def test_ingest_failure_in_store_stage_propagates():
+    """Test that a vector store failure stops the pipeline and is raised"""
+    class FailingVectorStore(FakeVectorStore):
+        async def add_chunks(self, chunks):
+            raise RuntimeError("store unavailable")
+    
+    use_case, _ = make_use_case([f"Story {i}" for i in range(50)], batch_size=1)
+    use_case.vector_store = FailingVectorStore()
+    
+    with pytest.raises(RuntimeError):
+        asyncio.run(asyncio.wait_for(use_case.execute("data/book.txt"), timeout=5))
+
+
+def test_ingest_parses_in_memory_content():
+    """Test that uploaded bytes are ingested without reading the file path"""
+    use_case, vector_store = make_use_case([])
+    use_case.document_loader = PDFDocumentLoader()
+    
+    result = asyncio.run(use_case.execute("data/missing.txt", b"Story one\n\nStory two"))
+    
+    assert result['stories_ingested'] == 2
+    chunks = [chunk for batch in vector_store.batches for chunk in batch]
+    assert [chunk.content for chunk in chunks] == ["Story one", "Story two"]
+    assert chunks[0].metadata['source'] == "data/missing.txt"
+
+
+def test_ingest_failure_removes_stored_chunks():
+    """Test that chunks stored before a failure are deleted again"""
+    class FailingEmbeddingService(FakeEmbeddingService):
+        calls = 0
+        
+        async def generate_embeddings_batch(self, texts):
+            self.calls += 1
+            if self.calls == 3:
+                raise RuntimeError("embedding service unavailable")
+            return await super().generate_embeddings_batch(texts)
+    
+    use_case, vector_store = make_use_case([f"Story {i}" for i in range(10)], batch_size=2)
+    use_case.embedding_service = FailingEmbeddingService()
+    
+    with pytest.raises(RuntimeError):
+        asyncio.run(use_case.execute("data/book.txt"))
+    assert [chunk for batch in vector_store.batches for chunk in batch] == []
+
+
+def test_ingest_splits_headers_only_in_single_story_documents():
+    """Test that numbered lines inside one of several stories are not headers"""
+    use_case, vector_store = make_use_case(["A shopping list:\n1. eggs\n2. milk", "Another story"])
+    
+    result = asyncio.run(use_case.execute("data/book.txt"))
+    
+    assert result['stories_ingested'] == 2
+    assert vector_store.batches[0][0].content == "A shopping list:\n1. eggs\n2. milk"
+
+
+def test_reingest_with_replace_drops_old_chunks():
+    """Test that replacing a source removes the chunks of its earlier ingest"""
+    use_case, vector_store = make_use_case(["Old story"])
+    asyncio.run(use_case.execute("data/book.txt"))
+    
+    use_case.document_loader = FakeDocumentLoader(["New story", "Another story"])
+    asyncio.run(use_case.execute("data/book.txt", replace=True))
+    
+    chunks = [chunk for batch in vector_store.batches for chunk in batch]
+    assert [chunk.content for chunk in chunks] == ["New story", "Another story"]
+
+
+def test_failed_replace_keeps_old_chunks():
+    """Test that a replacing ingest that fails leaves the earlier chunks in place"""
+    class FailingEmbeddingService(FakeEmbeddingService):
+        calls = 0
+        
+        async def generate_embeddings_batch(self, texts):
+            self.calls += 1
+            if self.calls == 3:
+                raise RuntimeError("embedding service unavailable")
+            return await super().generate_embeddings_batch(texts)
+    
+    use_case, vector_store = make_use_case(["Old story"], batch_size=2)
+    asyncio.run(use_case.execute("data/book.txt"))
+    
+    use_case.document_loader = FakeDocumentLoader([f"Story {i}" for i in range(10)])
+    use_case.embedding_service = FailingEmbeddingService()
+    with pytest.raises(RuntimeError):
+        asyncio.run(use_case.execute("data/book.txt", replace=True))
+    
+    chunks = [chunk for batch in vector_store.batches for chunk in batch]
+    assert [chunk.content for chunk in chunks] == ["Old story"]
@@ -0,0 +1,84 @@
+"""Tests for the ChromaDB vector store"""
+import asyncio
+import numpy as np
+from src.domain.models import StoryChunk
+from src.infrastructure.semantic_cache import SemanticCache
+from src.infrastructure.vector_store import MAX_BATCH, ChromaDBVectorStore
+
+
+def make_chunks(count, source="data/book.txt", start=0):
+    rng = np.random.default_rng(start)
+    return [
+        StoryChunk(
+            id=f"chunk-{i}",
+            content=f"story {i}",
+            metadata={'source': source},
+            embedding=rng.random(8, dtype=np.float32)
+        )
+        for i in range(start, start + count)
+    ]
+
+
+def make_store(tmp_path):
+    return ChromaDBVectorStore(
+        db_path=str(tmp_path / "chroma"),
+        collection_name="test_chunks",
+        query_cache=SemanticCache()
+    )
+
+
+def test_search_results_are_cached_until_the_collection_changes(tmp_path):
+    """Test that repeated searches hit the cache and writes clear it"""
+    store = make_store(tmp_path)
+    chunks = make_chunks(3)
+    query = chunks[0].embedding
+    
+    async def run():
+        await store.add_chunks(chunks)
+        first = await store.search_similar(query, top_k=2)
+        assert await store.search_similar(query, top_k=2) is first
+        
+        await store.add_chunks(make_chunks(1, start=3))
+        after_add = await store.search_similar(query, top_k=2)
+        assert after_add is not first
+        
+        await store.delete_chunks([chunks[0].id])
+        after_delete = await store.search_similar(query, top_k=2)
+        assert chunks[0].id not in [result.chunk.id for result in after_delete]
+    
+    asyncio.run(run())
+    assert store.query_cache.hits == 1
+
+
+def test_delete_by_source_keeps_listed_ids(tmp_path):
+    """Test that deleting a source spares the chunks it is told to keep"""
+    store = make_store(tmp_path)
+    
+    async def run():
+        await store.add_chunks(make_chunks(3) + make_chunks(2, source="data/other.txt", start=3))
+        await store.delete_by_source("data/book.txt", keep_ids=["chunk-1"])
+        collection = await store._ensure_collection()
+        return sorted(collection.get(include=[])['ids'])
+    
+    assert asyncio.run(run()) == ["chunk-1", "chunk-3", "chunk-4"]
+
+
+def test_large_adds_are_split_into_batches(tmp_path):
+    """Test that chunks are sent to Chroma in batches of at most MAX_BATCH"""
+    store = make_store(tmp_path)
+    sizes = []
+    
+    async def run():
+        collection = await store._ensure_collection()
+        add = collection.add
+        
+        def recording_add(ids, **kwargs):
+            sizes.append(len(ids))
+            add(ids=ids, **kwargs)
+        
+        collection.add = recording_add
+        await store.add_chunks(make_chunks(2 * MAX_BATCH + 1))
+        return collection.count()
+    
+    assert asyncio.run(run()) == 2 * MAX_BATCH + 1
+    assert sizes == [MAX_BATCH, MAX_BATCH, 1]